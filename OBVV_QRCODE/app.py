@@ -1,11 +1,22 @@
-from flask import Flask, render_template, request, redirect, send_file
+from flask import Flask, render_template, request, redirect, send_file, jsonify, make_response
 import sqlite3
-import qrcode
+import hashlib
 import json
+import csv
+import io
+import re
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from cryptography.fernet import Fernet
 import os
 
+import qr_render
+from qr_cache import QRCache
+
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Image, Paragraph, Spacer
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -20,11 +31,69 @@ os.makedirs(QR_FOLDER, exist_ok=True)
 with open("booth_secret.key", "rb") as f:
     cipher = Fernet(f.read())
 
+VOTER_ID_PATTERN = re.compile(r"[A-Z]{3}[0-9]{7}")
+MAX_REPORTED_ERRORS = 100
+
+# QR images are rendered on demand from each voter's stored token by a
+# process pool (RENDER_BATCH tokens per task for batches) and kept in a
+# size-bounded in-memory LRU instead of one PNG file per voter.
+RENDER_WORKERS = os.cpu_count() or 1
+RENDER_BATCH = 200
+QR_CACHE_BYTES = 64 * 1024 * 1024
+QR_MAX_AGE = 3600
+render_pool = None
+qr_cache = QRCache(QR_CACHE_BYTES)
+
+# Background pre-warm jobs (/qr/prewarm), polled at /jobs/<job_id>.
+render_jobs = {}
+jobs_lock = threading.Lock()
+
 
 def get_db():
     return sqlite3.connect(DB_NAME)
 
 
+# schema.sql with qr_filename nullable: voters added since images are
+# rendered on demand have no file.
+VOTERS_SCHEMA = """
+    CREATE TABLE {table} (
+        id INT IDENTITY(1,1) PRIMARY KEY,
+        voter_id VARCHAR(50) UNIQUE NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        qr_filename VARCHAR(255),
+        qr_token TEXT,
+        created_at DATETIME NOT NULL
+    )
+"""
+VOTER_COLUMNS = "id, voter_id, name, qr_filename, qr_token, created_at"
+
+
+def migrate_db():
+    db = get_db()
+    not_null = {row[1]: row[3] for row in db.execute("PRAGMA table_info(voters)")}
+    # Voters registered before tokens were stored get one on first use.
+    if not_null and "qr_token" not in not_null:
+        db.execute("ALTER TABLE voters ADD COLUMN qr_token TEXT")
+        db.commit()
+    if not_null.get("qr_filename"):
+        # SQLite cannot drop NOT NULL in place: rebuild the table.
+        db.execute("BEGIN")
+        db.execute(VOTERS_SCHEMA.format(table="voters_migrated"))
+        db.execute(f"INSERT INTO voters_migrated ({VOTER_COLUMNS}) SELECT {VOTER_COLUMNS} FROM voters")
+        db.execute("DROP TABLE voters")
+        db.execute("ALTER TABLE voters_migrated RENAME TO voters")
+        db.commit()
+    db.close()
+
+
+migrate_db()
+
+
+def voter_token(voter_id, name):
+    voter_data = {"voter_id": voter_id, "name": name}
+    return cipher.encrypt(json.dumps(voter_data).encode()).decode()
+
+
 @app.route("/")
 def index():
     db = get_db()
@@ -40,17 +109,10 @@ def add_voter():
     voter_id = request.form["voter_id"].strip().upper()
     name = request.form["name"].strip()
 
-    voter_data = {"voter_id": voter_id, "name": name}
-    encrypted = cipher.encrypt(json.dumps(voter_data).encode())
-
-    qr_filename = f"{voter_id}.png"
-    qr_path = os.path.join(QR_FOLDER, qr_filename)
-    qrcode.make(encrypted.decode()).save(qr_path)
-
     db = get_db()
     db.execute(
-        "INSERT INTO voters (voter_id, name, qr_filename, created_at) VALUES (?, ?, ?, ?)",
-        (voter_id, name, qr_filename, datetime.now().isoformat())
+        "INSERT INTO voters (voter_id, name, qr_token, created_at) VALUES (?, ?, ?, ?)",
+        (voter_id, name, voter_token(voter_id, name), datetime.now().isoformat())
     )
     db.commit()
     db.close()
@@ -58,18 +120,272 @@ def add_voter():
     return redirect("/")
 
 
+def read_voter_upload(upload):
+    """(line, voter_id, name) rows from a CSV (voter_id,name header) or JSONL upload."""
+    text = io.TextIOWrapper(upload.stream, encoding="utf-8-sig")
+    if upload.filename.lower().endswith((".jsonl", ".ndjson")):
+        rows = []
+        for line_no, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {}
+            if not isinstance(record, dict):
+                record = {}
+            rows.append((line_no, record.get("voter_id"), record.get("name")))
+        return rows
+    return [
+        (line_no, record.get("voter_id"), record.get("name"))
+        for line_no, record in enumerate(csv.DictReader(text), 2)
+    ]
+
+
+def validate_voters(db, rows):
+    """Normalised [(voter_id, name)] and a list of error strings."""
+    voters = []
+    errors = []
+    seen = set()
+    for line_no, voter_id, name in rows:
+        voter_id = str(voter_id or "").strip().upper()
+        name = str(name or "").strip()
+        if not VOTER_ID_PATTERN.fullmatch(voter_id):
+            errors.append(f"line {line_no}: invalid voter ID {voter_id!r}")
+        elif not name:
+            errors.append(f"line {line_no}: missing name for {voter_id}")
+        elif voter_id in seen:
+            errors.append(f"line {line_no}: {voter_id} appears twice")
+        else:
+            seen.add(voter_id)
+            voters.append((voter_id, name))
+
+    ids = [voter_id for voter_id, _ in voters]
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        existing = db.execute(
+            f"SELECT voter_id FROM voters WHERE voter_id IN ({','.join('?' * len(chunk))})",
+            chunk
+        ).fetchall()
+        errors.extend(f"{voter_id} is already registered" for (voter_id,) in existing)
+    return voters, errors
+
+
+def get_render_pool():
+    global render_pool
+    if render_pool is None:
+        render_pool = ProcessPoolExecutor(
+            RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return render_pool
+
+
+def render_qr(token):
+    """PNG bytes for a token, from the cache or rendered by the pool."""
+    png = qr_cache.get(token)
+    if png is None:
+        png = get_render_pool().submit(qr_render.render_png, token).result()
+        qr_cache.put(token, png)
+    return png
+
+
+def render_qrs(tokens):
+    """PNG bytes for many tokens; misses are rendered in parallel batches."""
+    pngs = {token: qr_cache.get(token) for token in tokens}
+    missing = [token for token, png in pngs.items() if png is None]
+    pool = get_render_pool()
+    futures = [
+        (missing[i:i + RENDER_BATCH], pool.submit(qr_render.render_pngs, missing[i:i + RENDER_BATCH]))
+        for i in range(0, len(missing), RENDER_BATCH)
+    ]
+    for batch, future in futures:
+        for token, png in zip(batch, future.result()):
+            qr_cache.put(token, png)
+            pngs[token] = png
+    return [pngs[token] for token in tokens]
+
+
+def give_tokens(db, voters):
+    """Store tokens for (voter_id, name, ...) voters registered before tokens
+    were kept; returns {voter_id: token}. A concurrent caller's token wins."""
+    db.executemany(
+        "UPDATE voters SET qr_token = ? WHERE voter_id = ? AND qr_token IS NULL",
+        [(voter_token(v[0], v[1]), v[0]) for v in voters]
+    )
+    db.commit()
+    ids = [v[0] for v in voters]
+    return dict(db.execute(
+        f"SELECT voter_id, qr_token FROM voters WHERE voter_id IN ({','.join('?' * len(ids))})", ids
+    ))
+
+
+def load_print_batch(db, after="", limit=None):
+    """(voter_id, name, token) in print order: voters after `after`, at most `limit`."""
+    voters = db.execute(
+        "SELECT voter_id, name, qr_token FROM voters WHERE voter_id > ? ORDER BY voter_id LIMIT ?",
+        (after, -1 if limit is None else limit)
+    ).fetchall()
+    missing = [v for v in voters if v[2] is None]
+    tokens = {}
+    for i in range(0, len(missing), 500):
+        tokens.update(give_tokens(db, missing[i:i + 500]))
+    return [(v[0], v[1], v[2] or tokens[v[0]]) for v in voters]
+
+
+def start_prewarm_job(tokens):
+    job_id = uuid.uuid4().hex
+    with jobs_lock:
+        render_jobs[job_id] = {
+            "total": len(tokens), "rendered": 0, "failed": 0,
+            "started": time.time(), "finished": None if tokens else time.time()
+        }
+
+    pool = get_render_pool()
+    for i in range(0, len(tokens), RENDER_BATCH):
+        batch = tokens[i:i + RENDER_BATCH]
+        future = pool.submit(qr_render.render_pngs, batch)
+        future.add_done_callback(
+            lambda future, batch=batch: record_prewarm_batch(job_id, batch, future)
+        )
+    return job_id
+
+
+def record_prewarm_batch(job_id, batch, future):
+    try:
+        pngs = future.result()
+    except Exception:
+        pngs = []
+    for token, png in zip(batch, pngs):
+        qr_cache.put(token, png)
+    with jobs_lock:
+        job = render_jobs[job_id]
+        job["rendered"] += len(pngs)
+        job["failed"] += len(batch) - len(pngs)
+        if job["rendered"] + job["failed"] == job["total"]:
+            job["finished"] = time.time()
+
+
+@app.route("/import", methods=["POST"])
+def import_voters():
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Upload a CSV or JSONL file as 'file'"}), 400
+
+    try:
+        rows = read_voter_upload(upload)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": f"Unreadable file: {e}"}), 400
+
+    db = get_db()
+    try:
+        voters, errors = validate_voters(db, rows)
+        if errors:
+            # All or nothing: fix the file and upload it again.
+            return jsonify({
+                "error_count": len(errors),
+                "errors": errors[:MAX_REPORTED_ERRORS]
+            }), 400
+
+        # Only the tokens are stored; images are rendered when first viewed.
+        created_at = datetime.now().isoformat()
+        db.executemany(
+            "INSERT INTO voters (voter_id, name, qr_token, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (voter_id, name, voter_token(voter_id, name), created_at)
+                for voter_id, name in voters
+            ]
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    return jsonify({"imported": len(voters)}), 201
+
+
+@app.route("/qr/<voter_id>.png")
+def voter_qr(voter_id):
+    db = get_db()
+    try:
+        row = db.execute(
+            "SELECT voter_id, name, qr_token FROM voters WHERE voter_id = ?", (voter_id,)
+        ).fetchone()
+        if row is None:
+            return jsonify({"error": "Unknown voter"}), 404
+        token = row[2] or give_tokens(db, [row])[voter_id]
+    finally:
+        db.close()
+
+    # The token never changes for a voter, so its digest is a strong ETag.
+    response = make_response()
+    response.set_etag(hashlib.sha256(token.encode()).hexdigest()[:32])
+    response.cache_control.private = True
+    response.cache_control.max_age = QR_MAX_AGE
+    response.make_conditional(request)
+    if response.status_code != 304:
+        response.set_data(render_qr(token))
+        response.mimetype = "image/png"
+    return response
+
+
+@app.route("/qr/prewarm", methods=["POST"])
+def prewarm_qrs():
+    """Render the next print batch (voters after `after`, `limit` of them) into the cache."""
+    after = request.args.get("after", "")
+    limit = request.args.get("limit", 500, type=int)
+    db = get_db()
+    try:
+        voters = load_print_batch(db, after, limit)
+    finally:
+        db.close()
+
+    tokens = [token for _, _, token in voters if token not in qr_cache]
+    job_id = start_prewarm_job(tokens)
+    return jsonify({
+        "voters": len(voters),
+        "cached": len(voters) - len(tokens),
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "next_after": voters[-1][0] if voters else None
+    }), 202
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    with jobs_lock:
+        job = render_jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "Unknown job"}), 404
+        job = dict(job)
+
+    elapsed = (job["finished"] or time.time()) - job["started"]
+    return jsonify({
+        "state": "done" if job["finished"] else "rendering",
+        "total": job["total"],
+        "rendered": job["rendered"],
+        "failed": job["failed"],
+        "seconds": round(elapsed, 3),
+        "qr_per_sec": round(job["rendered"] / elapsed, 1) if elapsed else None,
+        "cache": qr_cache.stats()
+    })
+
+
 @app.route("/delete/<voter_id>", methods=["POST"])
 def delete_voter(voter_id):
     db = get_db()
     row = db.execute(
-        "SELECT qr_filename FROM voters WHERE voter_id = ?",
+        "SELECT qr_filename, qr_token FROM voters WHERE voter_id = ?",
         (voter_id,)
     ).fetchone()
 
     if row:
-        qr_path = os.path.join(QR_FOLDER, row[0])
-        if os.path.exists(qr_path):
-            os.remove(qr_path)
+        # Images from before on-demand rendering are still files; newer
+        # voters have none (NULL qr_filename).
+        if row[0]:
+            qr_path = os.path.join(QR_FOLDER, row[0])
+            if os.path.exists(qr_path):
+                os.remove(qr_path)
+        if row[1]:
+            qr_cache.discard(row[1])
 
         db.execute("DELETE FROM voters WHERE voter_id = ?", (voter_id,))
         db.commit()
@@ -80,11 +396,15 @@ def delete_voter(voter_id):
 
 @app.route("/print_pdf")
 def print_pdf():
+    """The voter list, or with `after` / `limit` one print batch of it."""
     db = get_db()
-    voters = db.execute(
-        "SELECT voter_id, name, qr_filename FROM voters ORDER BY voter_id"
-    ).fetchall()
-    db.close()
+    try:
+        voters = load_print_batch(
+            db, request.args.get("after", ""), request.args.get("limit", type=int)
+        )
+    finally:
+        db.close()
+    pngs = render_qrs([token for _, _, token in voters])
 
     pdf_path = "voter_list.pdf"
     styles = getSampleStyleSheet()
@@ -95,8 +415,8 @@ def print_pdf():
 
     table_data = [["Voter ID", "Name", "QR Code"]]
 
-    for v in voters:
-        img = Image(os.path.join(QR_FOLDER, v[2]), width=70, height=70)
+    for v, png in zip(voters, pngs):
+        img = Image(io.BytesIO(png), width=70, height=70)
         table_data.append([v[0], v[1], img])
 
     table = Table(table_data, colWidths=[170, 170, 120])
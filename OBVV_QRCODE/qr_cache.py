@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+# Rendered QR PNGs kept in memory, least recently used first out once
+# their total size passes max_bytes. Keyed by the voter's encrypted
+# token, so a re-registered voter never gets a stale image.
+
+
+class QRCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            png = self._images.get(token)
+            if png is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(token)
+            self.hits += 1
+            return png
+
+    def __contains__(self, token):
+        with self._lock:
+            return token in self._images
+
+    def put(self, token, png):
+        with self._lock:
+            old = self._images.pop(token, None)
+            if old is not None:
+                self.size -= len(old)
+            self._images[token] = png
+            self.size += len(png)
+            while self.size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def discard(self, token):
+        with self._lock:
+            png = self._images.pop(token, None)
+            if png is not None:
+                self.size -= len(png)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "images": len(self._images),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,16 @@
+import io
+
+import qrcode
+
+# QR rendering, run in worker processes (see app.py). Tokens arrive
+# already encrypted; a worker only turns them into PNG bytes.
+
+
+def render_png(token):
+    buffer = io.BytesIO()
+    qrcode.make(token).save(buffer)
+    return buffer.getvalue()
+
+
+def render_pngs(tokens):
+    return [render_png(token) for token in tokens]
@@ -0,0 +1,63 @@
+"""Bytes per in-memory block: original dict-based Block vs. the slotted one.
+
+    python -m benchmarks.block_memory --blocks 100000
+"""
+import argparse
+import hashlib
+import tracemalloc
+from datetime import datetime, timedelta
+
+from blockchain import Block, Blockchain
+
+
+class DictBlock:
+    # The booth scripts' original Block, plus the hash-link fields.
+    def __init__(self, index, timestamp, voter_hash, previous_hash):
+        self.index = index
+        self.timestamp = timestamp
+        self.voter_hash = voter_hash
+        self.previous_hash = previous_hash
+        self.hash = hashlib.sha256(
+            f"{index}|{timestamp}|{voter_hash}|{previous_hash}".encode()
+        ).hexdigest()
+
+
+def measure(make_block, n):
+    start = datetime(2026, 2, 5, 8, 0, 0, 123456)
+    tracemalloc.start()
+    previous = "0" * 64
+    blocks = []
+    for index in range(n):
+        # Built per vote, as in the booth loop, so retained strings are counted.
+        timestamp = (start + timedelta(seconds=index)).isoformat()
+        voter_hash = hashlib.sha256(str(index).encode()).hexdigest()
+        block = make_block(index, timestamp, voter_hash, previous)
+        previous = block.hash
+        blocks.append(block)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=100000)
+    args = parser.parse_args()
+
+    before = measure(DictBlock, args.blocks)
+    after = measure(Block, args.blocks)
+    print(f"dict Block   : {before:7.1f} bytes/block")
+    print(f"slotted Block: {after:7.1f} bytes/block")
+
+    tracemalloc.start()
+    chain = Blockchain()
+    for i in range(args.blocks):
+        chain.add_block(f"{i:064x}", "2026-02-05T21:41:56.958952")
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Blockchain after {args.blocks} blocks (window {chain.chain.maxlen}): "
+          f"{current / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
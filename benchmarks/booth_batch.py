@@ -0,0 +1,46 @@
+"""End-to-end booth throughput without a camera, via booth.run_batch.
+
+    python -m benchmarks.booth_batch --voters 500
+    python -m benchmarks.booth_batch --source OBVV_QRCODE/static/qrs --hold 10
+"""
+import argparse
+import os
+import tempfile
+
+from booth import run_batch
+from ledger_writer import GROUP, STRICT
+from qr_scanner import ADAPTIVE, FULL_FRAME
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=500)
+    parser.add_argument("--source", help="defaults to synthetic:<voters>")
+    parser.add_argument("--hold", type=int, default=1)
+    args = parser.parse_args()
+    source = args.source or f"synthetic:{args.voters}"
+
+    rows = []
+    for durability in (STRICT, GROUP):
+        for detection in (FULL_FRAME, ADAPTIVE):
+            with tempfile.TemporaryDirectory() as tmp:
+                report = run_batch(
+                    source, os.path.join(tmp, "batch_ledger_bench.db"),
+                    durability=durability, detection=detection, hold=args.hold
+                )
+            rows.append(report)
+            print()
+
+    print(f"{'durability':10} {'detection':9} {'votes/s':>8} {'frames/s':>9} "
+          f"{'no_qr':>6} {'invalid':>7} {'decode p95 ms':>13} {'record p95 ms':>13}")
+    for r in rows:
+        lat = r["latency_ms"]
+        decode_p95 = lat["decode"]["p95"] if lat["decode"] else "-"
+        record_p95 = lat["record"]["p95"] if lat["record"] else "-"
+        print(f"{r['durability']:10} {r['detection']:9} {r['votes_per_sec']:8} "
+              f"{r['frames_per_sec']:9} {r['no_qr']:6} {r['invalid_qr']:7} "
+              f"{decode_p95:>13} {record_p95:>13}")
+
+
+if __name__ == "__main__":
+    main()
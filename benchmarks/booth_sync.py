@@ -0,0 +1,192 @@
+"""A simulated fleet of booths pushing votes to a local central server.
+
+    python -m benchmarks.booth_sync --booths 200 --votes 500 --rate 20
+    python -m benchmarks.booth_sync --booths 200 --slow-ms 200 --fail-rate 0.1
+
+Runs central_verification on a local threaded HTTP/1.1 server (a fresh
+central DB in a temp dir) and --booths booths, each recording --votes
+votes at --rate votes/s through a LedgerWriter while its SyncAgent
+pushes them. --slow-ms delays every central write transaction;
+--fail-rate drops that share of /ingest replies after the batch was
+applied, so the agent has to resend it. At the end every booth must be
+acked up to its last vote and the central totals must match the votes.
+Each booth signs its pushes with its own key, copied to the central
+server's booth_keys directory.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server
+
+import central_verification
+from benchmarks.synthetic_ledgers import use_base_dir
+from blockchain import Blockchain
+from booth_sync import SyncAgent
+from ledger_writer import GROUP, LedgerWriter
+
+
+class LostReplies:
+    """WSGI wrapper: answer 500 to a share of /ingest pushes after applying them."""
+
+    def __init__(self, app, rate, seed=0):
+        self.app = app
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.lost = 0
+
+    def __call__(self, environ, start_response):
+        if environ["PATH_INFO"] != "/ingest" or self.rng.random() >= self.rate:
+            return self.app(environ, start_response)
+        for _ in self.app(environ, lambda *args: None):
+            pass
+        self.lost += 1
+        start_response("500 INTERNAL SERVER ERROR", [("Content-Length", "0")])
+        return []
+
+
+def voter_hash(n):
+    return hashlib.sha256(f"VOTER{n:09d}".encode()).hexdigest()
+
+
+def run_booth(ledger_path, voters, rate, latencies, start_event):
+    """Record `voters` at `rate` votes/s; vote latency is save + durable commit."""
+    writer = LedgerWriter(ledger_path, durability=GROUP, group_size=64, group_interval_ms=20)
+    chain = Blockchain()
+    start_event.wait()
+    next_at = time.perf_counter()
+    for n in voters:
+        t0 = time.perf_counter()
+        block = chain.add_block(voter_hash(n), "2026-02-05T07:00:00.000000")
+        seq = writer.save_vote(block.index, block.voter_hash, block.timestamp,
+                               previous_hash=block.previous_hash, block_hash=block.hash)
+        writer.wait_durable(seq)
+        latencies.append(time.perf_counter() - t0)
+        next_at += 1 / rate
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    writer.close()
+
+
+def percentile_ms(samples, p):
+    ordered = sorted(samples)
+    return 1000 * ordered[min(len(ordered) * p // 100, len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=200)
+    parser.add_argument("--votes", type=int, default=500, help="votes per booth")
+    parser.add_argument("--rate", type=float, default=20, help="votes/s per booth")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    parser.add_argument("--slow-ms", type=float, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for sync")
+    parser.add_argument("--offline", action="store_true", help="no sync agents: baseline latency")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        central_dir, booth_dir = os.path.join(tmp, "central"), os.path.join(tmp, "booths")
+        os.mkdir(central_dir)
+        os.mkdir(booth_dir)
+        use_base_dir(central_dir)
+        os.mkdir(central_verification.BOOTH_KEYS_DIR)
+
+        writer = central_verification.push_writer
+        apply = writer.apply
+        if args.slow_ms:
+            def slow_apply(batches):
+                time.sleep(args.slow_ms / 1000)
+                return apply(batches)
+            writer.apply = slow_apply
+        app = LostReplies(central_verification.app, args.fail_rate)
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        # Keep-alive needs HTTP/1.1; the werkzeug default is 1.0. The default
+        # listen backlog (128) would drop some of a large fleet's connects.
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        BaseWSGIServer.request_queue_size = 4096
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        # Voters: mostly new, a share reusing a voter from any booth.
+        plans, next_voter = [], 0
+        for _ in range(args.booths):
+            voters = []
+            for _ in range(args.votes):
+                if next_voter and rng.random() < args.duplicate_rate:
+                    voters.append(rng.randrange(next_voter))
+                else:
+                    voters.append(next_voter)
+                    next_voter += 1
+            plans.append(voters)
+
+        start_event = threading.Event()
+        latencies = []
+        booths, agents = [], []
+        for booth, voters in enumerate(plans, 1):
+            path = os.path.join(booth_dir, f"booth_ledger_{booth}.db")
+            thread = threading.Thread(target=run_booth,
+                                      args=(path, voters, args.rate, latencies, start_event))
+            thread.start()
+            booths.append(thread)
+            # The ledger exists once its writer has started.
+            while not os.path.exists(path):
+                time.sleep(0.001)
+            if not args.offline:
+                key = os.urandom(32).hex().encode()
+                key_path = os.path.join(central_verification.BOOTH_KEYS_DIR, f"{os.path.basename(path)}.key")
+                with open(key_path, "wb") as key_file:
+                    key_file.write(key)
+                agent = SyncAgent(path, url, key, batch_rows=args.batch_rows, interval=0.2)
+                agent.start()
+                agents.append(agent)
+
+        start = time.perf_counter()
+        start_event.set()
+        for thread in booths:
+            thread.join()
+        voting = time.perf_counter() - start
+
+        deadline = time.perf_counter() + args.timeout
+        while (any(agent.acked_id != args.votes for agent in agents)
+               and time.perf_counter() < deadline):
+            time.sleep(0.05)
+        synced = time.perf_counter() - start
+        for agent in agents:
+            agent.stop()
+        server.shutdown()
+
+        total = args.booths * args.votes
+        stats = [agent.stats() for agent in agents]
+        totals = central_verification.load_verification_totals()
+        expected = (total, next_voter, total - next_voter)
+        print(f"{args.booths} booths x {args.votes} votes at {args.rate}/s, "
+              f"slow {args.slow_ms} ms, lost replies {app.lost}")
+        print(f"voting took {voting:.1f}s, all synced after {synced:.1f}s "
+              f"({sum(s['acked_id'] == args.votes for s in stats)}/{args.booths} booths)")
+        print(f"vote latency p50 {percentile_ms(latencies, 50):.1f} ms, "
+              f"p99 {percentile_ms(latencies, 99):.1f} ms")
+        if args.offline:
+            return
+        print(f"pushed {sum(s['rows_sent'] for s in stats)} rows in "
+              f"{sum(s['batches'] for s in stats)} batches, "
+              f"{sum(s['bytes_sent'] for s in stats) / total:.1f} B/row; "
+              f"503s {sum(s['busy'] for s in stats)}, retries {sum(s['retries'] for s in stats)}, "
+              f"connections {sum(s['connections'] for s in stats)}")
+        errors = {s["last_error"] for s in stats if s["last_error"]}
+        print("central writer:", writer.stats())
+        print("last agent errors:", errors or None)
+        print(f"central totals {totals} vs expected {expected}: "
+              f"{'identical' if tuple(totals) == expected else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    main()
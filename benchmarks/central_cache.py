@@ -0,0 +1,60 @@
+"""Concurrent /start_verification requests against the result cache.
+
+    python -m benchmarks.central_cache --requests 20 --engine python
+
+Fires --requests simultaneous requests (a burst of operators), then the
+same again with unchanged ledgers, then once more after a booth appends
+votes. Each burst should cost one engine run at most.
+"""
+import argparse
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import central_verification
+from benchmarks.synthetic_ledgers import append_votes, build_booth_ledgers, use_base_dir
+
+
+def burst(client, engine, requests):
+    sources = Counter()
+    lock = threading.Lock()
+
+    def hit():
+        source = client.get(f"/start_verification?engine={engine}").get_json()["source"]
+        with lock:
+            sources[source] += 1
+
+    threads = [threading.Thread(target=hit) for _ in range(requests)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, dict(sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=50000, help="rows per booth")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--engine", default="python",
+                        choices=list(central_verification.VERIFICATION_ENGINES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voters = build_booth_ledgers(tmp, args.booths, args.rows)
+        use_base_dir(tmp)
+        client = central_verification.app.test_client()
+
+        for label, change in (("cold", None), ("unchanged", None), ("after append", 1)):
+            if change:
+                append_votes(tmp, change, range(voters, voters + 100))
+            elapsed, sources = burst(client, args.engine, args.requests)
+            print(f"{label:13} {args.requests} requests in {elapsed:6.2f}s  {sources}")
+        print(central_verification.verification_results.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare full central verification engines on synthetic booth ledgers.
+
+    python -m benchmarks.central_engines --booths 50 --rows 200000 --engines sql
+    python -m benchmarks.central_engines --booths 10 --rows 100000
+
+Every engine must produce the same JSON; results are checked against the
+first engine run. 50 x 200000 is the 10M-vote case; the "python" engine
+needs several GB of RAM there.
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+import central_verification
+from benchmarks.synthetic_ledgers import build_booth_ledgers, use_base_dir
+
+FULL_ENGINES = [name for name in central_verification.VERIFICATION_ENGINES if name != "incremental"]
+
+# These keep the earliest vote by timestamp rather than the first one in
+# booth order: same counts, but a different vote of a pair may be listed.
+TIME_ORDERED_ENGINES = {"merge"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=200000, help="rows per booth")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--engines", nargs="+", default=FULL_ENGINES, choices=FULL_ENGINES)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="report peak Python heap (slows engines down)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        build_booth_ledgers(tmp, args.booths, args.rows, duplicate_rate=args.duplicate_rate)
+        print(f"built {args.booths} x {args.rows} rows in {time.perf_counter() - start:.1f}s")
+        use_base_dir(tmp)
+
+        # One reference per ordering: booth order or time order.
+        references = {}
+        for engine in args.engines:
+            if args.trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = central_verification.VERIFICATION_ENGINES[engine]()
+            elapsed = time.perf_counter() - start
+            peak = None
+            if args.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            encoded = json.dumps(result)
+            reference = references.setdefault(
+                engine in TIME_ORDERED_ENGINES, encoded
+            )
+            same = "identical" if encoded == reference else "DIFFERENT"
+            memory = f" peak={peak / 1e6:.0f}MB" if peak is not None else ""
+            print(f"{engine:8} {elapsed:8.2f}s total={result['total_votes']} "
+                  f"duplicates={result['duplicate_votes']} {same}{memory}")
+
+
+if __name__ == "__main__":
+    main()
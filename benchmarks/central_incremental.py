@@ -0,0 +1,48 @@
+"""Full re-scan vs. incremental verification after a small delta.
+
+    python -m benchmarks.central_incremental --booths 4 --rows 250000 --delta 300
+"""
+import argparse
+import tempfile
+import time
+
+import central_verification
+from benchmarks.synthetic_ledgers import append_votes, build_booth_ledgers, use_base_dir
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=250000, help="rows per booth")
+    parser.add_argument("--delta", type=int, default=300, help="new rows before re-verifying")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voters = build_booth_ledgers(tmp, args.booths, args.rows)
+        use_base_dir(tmp)
+
+        full, elapsed = timed(central_verification.detect_duplicates_and_counts)
+        print(f"full re-scan            : {elapsed:8.3f}s  total={full['total_votes']}")
+
+        first, elapsed = timed(central_verification.ingest_new_votes)
+        print(f"incremental, first run  : {elapsed:8.3f}s  total={first['total_votes']}")
+
+        # Half new voters, half repeat voters, spread over the booths.
+        delta = [voters + i if i % 2 else i for i in range(args.delta)]
+        for booth in range(1, args.booths + 1):
+            append_votes(tmp, booth, delta[booth - 1::args.booths])
+
+        delta_result, elapsed = timed(central_verification.ingest_new_votes)
+        print(f"incremental, +{args.delta} rows : {elapsed:8.3f}s  "
+              f"new_votes={delta_result['new_votes']} "
+              f"new_duplicates={len(delta_result['new_duplicates'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Parallel streaming reads of booth ledgers vs. worker count.
+
+    python -m benchmarks.central_ingest --booths 16 --rows 100000
+
+Reports the wall-clock of a read-only pass (ledger I/O + row decoding) and
+of the full python engine for 1, 2, 4 and 8 reader threads, plus 4
+reader processes. Expect scaling only up to the number of cores and
+until the disk saturates.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import central_verification
+from benchmarks.synthetic_ledgers import build_booth_ledgers, use_base_dir
+from ledger_stream import iter_ledger_chunks
+
+
+def read_only(sources, workers, use_processes):
+    rows = 0
+    for _, chunk in iter_ledger_chunks(sources, workers=workers, use_processes=use_processes):
+        rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=100000, help="rows per booth")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_booth_ledgers(tmp, args.booths, args.rows)
+        use_base_dir(tmp)
+        sources = [(path, 0) for _, path in central_verification.booth_sources()]
+        print(f"{args.booths} booths x {args.rows} rows, {os.cpu_count()} CPUs")
+
+        tracemalloc.start()
+        read_only(sources, 1, False)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"read-only peak Python memory: {peak / 1e6:.1f} MB")
+
+        print(f"{'readers':12} {'read-only s':>12} {'python engine s':>16}")
+        for workers, use_processes in ((1, False), (2, False), (4, False), (8, False), (4, True)):
+            start = time.perf_counter()
+            read_only(sources, workers, use_processes)
+            read_elapsed = time.perf_counter() - start
+
+            central_verification.READ_WORKERS = workers
+            central_verification.READ_USE_PROCESSES = use_processes
+            start = time.perf_counter()
+            central_verification.detect_duplicates_and_counts()
+            engine_elapsed = time.perf_counter() - start
+
+            label = f"{workers} {'processes' if use_processes else 'threads'}"
+            print(f"{label:12} {read_elapsed:12.2f} {engine_elapsed:16.2f}")
+
+        slowest = max(
+            central_verification.last_read_timings.items(),
+            key=lambda item: item[1]["read_seconds"]
+        )
+        print("slowest booth read:", slowest)
+
+
+if __name__ == "__main__":
+    main()
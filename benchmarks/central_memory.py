@@ -0,0 +1,93 @@
+"""Peak RSS of the full central verification engines.
+
+    python -m benchmarks.central_memory --booths 50 --rows 1000000 --engines compact
+    python -m benchmarks.central_memory --booths 10 --rows 100000
+
+Each engine runs in a fresh interpreter so its ru_maxrss is its own. The
+result JSON is hashed in the child and compared across engines. --dir
+keeps the generated ledgers so large runs can be repeated.
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import central_verification
+from benchmarks.central_engines import TIME_ORDERED_ENGINES
+from benchmarks.synthetic_ledgers import build_booth_ledgers, use_base_dir
+
+FULL_ENGINES = [name for name in central_verification.VERIFICATION_ENGINES if name != "incremental"]
+
+
+def run_engine(base_dir, engine):
+    """Child side: run one engine and print its measurements as JSON."""
+    use_base_dir(base_dir)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = central_verification.VERIFICATION_ENGINES[engine]()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "elapsed": elapsed,
+        # Linux reports KiB.
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "baseline_rss": baseline * 1024,
+        "total_votes": result["total_votes"],
+        "duplicate_votes": result["duplicate_votes"],
+        "digest": hashlib.sha256(json.dumps(result).encode()).hexdigest(),
+    }))
+
+
+def measure(base_dir, engine):
+    central_db = os.path.join(base_dir, "central_duplicates.db")
+    if os.path.exists(central_db):
+        os.remove(central_db)
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.central_memory", "--dir", base_dir, "--child", engine],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=100000, help="rows per booth")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--engines", nargs="+", default=FULL_ENGINES, choices=FULL_ENGINES)
+    parser.add_argument("--dir", help="ledger directory (built if it has no ledgers)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_engine(args.dir, args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = args.dir or tmp
+        if not any(f.startswith("booth_ledger_") for f in os.listdir(base_dir)):
+            start = time.perf_counter()
+            build_booth_ledgers(base_dir, args.booths, args.rows, duplicate_rate=args.duplicate_rate)
+            print(f"built {args.booths} x {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        # One reference per ordering: booth order or time order.
+        references = {}
+        print(f"{'engine':8} {'seconds':>8} {'peak RSS MB':>12} {'bytes/vote':>11}")
+        for engine in args.engines:
+            stats = measure(base_dir, engine)
+            reference = references.setdefault(
+                engine in TIME_ORDERED_ENGINES, stats["digest"]
+            )
+            same = "identical" if stats["digest"] == reference else "DIFFERENT"
+            per_vote = (stats["peak_rss"] - stats["baseline_rss"]) / max(stats["total_votes"], 1)
+            print(f"{engine:8} {stats['elapsed']:8.2f} {stats['peak_rss'] / 1e6:12.0f} "
+                  f"{per_vote:11.0f} total={stats['total_votes']} "
+                  f"duplicates={stats['duplicate_votes']} {same}")
+
+
+if __name__ == "__main__":
+    main()
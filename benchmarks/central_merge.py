@@ -0,0 +1,88 @@
+"""Peak RSS of the k-way merge engine as the vote count grows.
+
+    python -m benchmarks.central_merge --booths 10 --rows 50000 200000 800000
+    python -m benchmarks.central_merge --booths 10 --rows 100000 --indexed
+
+For each ledger size the merge runs in a fresh interpreter with duplicates
+streamed to a counting sink, so peak RSS should stay flat. --indexed adds
+a (voter_hash, timestamp) index to the ledgers so they are merged in index
+order instead of through on-disk sort runs.
+"""
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_ledgers import build_booth_ledgers
+from central_merge import find_duplicates_merge
+from central_verification import booth_display_name
+
+
+def run_merge(base_dir):
+    """Child side: merge every ledger in `base_dir` and print measurements."""
+    booths = [
+        (booth_display_name(f), os.path.join(base_dir, f))
+        for f in sorted(os.listdir(base_dir)) if f.startswith("booth_ledger_")
+    ]
+    streamed = 0
+
+    def count(batch):
+        nonlocal streamed
+        streamed += len(batch)
+
+    start = time.perf_counter()
+    result = find_duplicates_merge(booths, sink=count)
+    print(json.dumps({
+        "elapsed": time.perf_counter() - start,
+        # Linux reports KiB.
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "total_votes": result["total_votes"],
+        "duplicates": streamed,
+    }))
+
+
+def add_index(base_dir):
+    for f in os.listdir(base_dir):
+        conn = sqlite3.connect(os.path.join(base_dir, f))
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_booth_ledger_voter_hash
+            ON booth_ledger (voter_hash, timestamp)
+        """)
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=10)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 200000, 800000],
+                        help="rows per booth, one run per value")
+    parser.add_argument("--indexed", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_merge(args.child)
+        return
+
+    print(f"{'votes':>10} {'seconds':>8} {'peak RSS MB':>12} {'duplicates':>11}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_booth_ledgers(tmp, args.booths, rows)
+            if args.indexed:
+                add_index(tmp)
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.central_merge", "--child", tmp],
+                check=True, capture_output=True, text=True
+            ).stdout
+        stats = json.loads(output.splitlines()[-1])
+        print(f"{stats['total_votes']:10} {stats['elapsed']:8.1f} "
+              f"{stats['peak_rss'] / 1e6:12.0f} {stats['duplicates']:11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Scaling of the sharded engine with 1, 2, 4 and 8 worker processes.
+
+    python -m benchmarks.central_shard --booths 8 --rows 250000
+
+Each run is checked against the single-process python engine. The first
+run per worker count starts that pool; "reused" is a second run on the
+pool a long-running server keeps. Speed-up is bounded by the number of
+cores; every worker still reads all ledger pages, so with a cold page
+cache the disk can become the limit. The "slowest shard" column times
+each shard alone: the wall time to expect with at least that many free
+cores.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import central_verification
+from benchmarks.synthetic_ledgers import build_booth_ledgers, use_base_dir
+from central_shard import find_duplicates_sharded, scan_shard, shard_ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--booths", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=250000, help="rows per booth")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_booth_ledgers(tmp, args.booths, args.rows)
+        use_base_dir(tmp)
+        booths = central_verification.booth_sources()
+        print(f"{args.booths} booths x {args.rows} rows, {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        reference = json.dumps(central_verification.detect_duplicates_and_counts())
+        baseline = time.perf_counter() - start
+        print(f"{'python':10} {baseline:8.2f}s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            find_duplicates_sharded(booths, workers=workers)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            result = find_duplicates_sharded(booths, workers=workers)
+            elapsed = time.perf_counter() - start
+            same = "identical" if json.dumps(result) == reference else "DIFFERENT"
+
+            slowest = 0.0
+            for low, high in shard_ranges(workers):
+                start = time.perf_counter()
+                scan_shard(booths, low, high)
+                slowest = max(slowest, time.perf_counter() - start)
+            print(f"{workers:2} workers first {first:6.2f}s reused {elapsed:6.2f}s  "
+                  f"speed-up {baseline / elapsed:4.2f}x  "
+                  f"slowest shard {slowest:6.2f}s  {same}")
+
+
+if __name__ == "__main__":
+    main()
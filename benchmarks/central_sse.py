@@ -0,0 +1,106 @@
+"""Load test of the live /events stream with many concurrent viewers.
+
+    python -m benchmarks.central_sse --clients 300 --rounds 5
+
+Serves central_verification on a local port, connects --clients SSE
+viewers, then appends votes to a booth ledger --rounds times. Reports how
+long the delta took to reach every viewer and how many verifications the
+server ran; it should be one per round, not one per viewer.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+import central_verification
+from benchmarks.synthetic_ledgers import append_votes, build_booth_ledgers, use_base_dir
+
+
+class Viewer(threading.Thread):
+    def __init__(self, port, deltas):
+        super().__init__(daemon=True)
+        self.port = port
+        self.deltas = deltas
+        self.connected = threading.Event()
+        self.received = []
+
+    def run(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port)
+        conn.request("GET", "/events")
+        response = conn.getresponse()
+        event = None
+        for line in response.fp:
+            line = line.decode().rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "snapshot":
+                    self.connected.set()
+                elif event == "delta":
+                    self.received.append((time.perf_counter(), json.loads(line[len("data: "):])))
+                    self.deltas.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--votes", type=int, default=1000, help="votes appended per round")
+    parser.add_argument("--poll", type=float, default=0.2, help="ledger poll interval, seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voters = build_booth_ledgers(tmp, 4, 20000)
+        use_base_dir(tmp)
+        central_verification.live_verifier.poll_interval = args.poll
+
+        server = make_server("127.0.0.1", 0, central_verification.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        # Let the verifier catch up with the initial ledgers before any
+        # viewer connects, so every delta below belongs to a round.
+        central_verification.live_verifier.start()
+        while central_verification.live_verifier.computations == 0:
+            time.sleep(0.05)
+        computations = central_verification.live_verifier.computations
+
+        deltas = threading.Semaphore(0)
+        start = time.perf_counter()
+        viewers = [Viewer(server.server_port, deltas) for _ in range(args.clients)]
+        for viewer in viewers:
+            viewer.start()
+        for viewer in viewers:
+            viewer.connected.wait()
+        print(f"{args.clients} viewers connected in {time.perf_counter() - start:.2f}s")
+
+        latencies = []
+        for round_number in range(args.rounds):
+            # One repeat voter per round, the rest new.
+            numbers = [round_number] + list(range(voters, voters + args.votes - 1))
+            voters += args.votes - 1
+            appended = time.perf_counter()
+            append_votes(tmp, 1 + round_number % 4, numbers)
+            for _ in viewers:
+                deltas.acquire()
+            latencies.extend(viewer.received[-1][0] - appended for viewer in viewers)
+
+        last = viewers[0].received[-1][1]
+        stats = central_verification.live_verifier.stats()
+        print(f"delta latency over {len(latencies)} deliveries: "
+              f"p50={1000 * statistics.median(latencies):.0f}ms "
+              f"p99={1000 * sorted(latencies)[int(0.99 * (len(latencies) - 1))]:.0f}ms "
+              f"max={1000 * max(latencies):.0f}ms")
+        print(f"verifications for {args.rounds} rounds: {stats['computations'] - computations} "
+              f"(last {1000 * stats['last_compute_seconds']:.0f}ms), "
+              f"dropped viewers: {central_verification.live_updates.dropped}")
+        print(f"final counts: total={last['total_votes']} duplicates={last['duplicate_votes']}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
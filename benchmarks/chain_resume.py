@@ -0,0 +1,56 @@
+"""Booth restart cost: O(1) resume from chain_tip vs. a full streaming verify.
+
+    python -m benchmarks.chain_resume --rows 2000000
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+from blockchain import Blockchain, verify_chain
+from ledger_writer import GROUP, LedgerWriter
+
+
+def build_ledger(db_name, rows):
+    writer = LedgerWriter(db_name, durability=GROUP, group_size=50000, group_interval_ms=1000)
+    chain = Blockchain()
+    for i in range(rows):
+        voter_hash = hashlib.sha256(str(i).encode()).hexdigest()
+        block = chain.add_block(voter_hash, "2026-02-05T21:41:56.958952")
+        writer.save_vote(block.index, voter_hash, block.timestamp,
+                         previous_hash=block.previous_hash, block_hash=block.hash)
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "booth_ledger_bench.db")
+        start = time.perf_counter()
+        build_ledger(db_name, args.rows)
+        print(f"built {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        chain = Blockchain.resume(db_name)
+        elapsed = time.perf_counter() - start
+        print(f"resume      : {1000 * elapsed:8.2f} ms  (tip index {chain.get_latest_block().index})")
+
+        start = time.perf_counter()
+        result = verify_chain(db_name)
+        elapsed = time.perf_counter() - start
+        print(f"full verify : {1000 * elapsed:8.2f} ms  {result}")
+
+        tracemalloc.start()
+        verify_chain(db_name)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"full verify peak Python memory: {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Block hashing and chain verification throughput (blocks/sec).
+
+    python -m benchmarks.chain_verify --rows 1000000 --delta 1000
+
+The ledger starts empty and is verified once before any row is written,
+so the incremental pass also checks that a checkpoint taken on an empty
+ledger carries over to the rows added after it.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from blockchain import Blockchain, verify_chain
+from benchmarks.chain_resume import build_ledger
+from ledger_writer import LedgerWriter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--delta", type=int, default=1000)
+    args = parser.parse_args()
+
+    chain = Blockchain()
+    start = time.perf_counter()
+    for i in range(100000):
+        chain.add_block(f"{i:064x}", "2026-02-05T21:41:56.958952")
+    elapsed = time.perf_counter() - start
+    print(f"add_block (hash + link): {100000 / elapsed:12.0f} blocks/sec")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "booth_ledger_bench.db")
+        LedgerWriter(db_name).close()
+        empty = verify_chain(db_name)
+        build_ledger(db_name, args.rows)
+
+        from_empty = verify_chain(db_name, since=empty["checkpoint"])
+        print(f"from empty      {from_empty['blocks']:9} blocks valid={from_empty['valid']}")
+        if not from_empty["valid"] or from_empty["blocks"] != args.rows:
+            raise SystemExit(f"checkpoint of an empty ledger did not carry over: {from_empty}")
+
+        start = time.perf_counter()
+        full = verify_chain(db_name)
+        elapsed = time.perf_counter() - start
+        print(f"full verify     {full['blocks']:9} blocks {elapsed:8.3f}s "
+              f"{full['blocks'] / elapsed:12.0f} blocks/sec valid={full['valid']}")
+
+        chain = Blockchain.resume(db_name)
+        writer = LedgerWriter(db_name)
+        for i in range(args.delta):
+            block = chain.add_block(f"{i:064x}", "2026-02-06T08:00:00.000000")
+            writer.save_vote(block.index, block.voter_hash, block.timestamp,
+                             previous_hash=block.previous_hash, block_hash=block.hash)
+        writer.close()
+
+        start = time.perf_counter()
+        delta = verify_chain(db_name, since=full["checkpoint"])
+        elapsed = time.perf_counter() - start
+        print(f"incremental     {delta['blocks']:9} blocks {elapsed:8.3f}s "
+              f"{delta['blocks'] / elapsed:12.0f} blocks/sec valid={delta['valid']}")
+
+
+if __name__ == "__main__":
+    main()
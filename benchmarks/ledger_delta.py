@@ -0,0 +1,94 @@
+"""Moving a booth ledger to the central server: delta file vs. the raw .db.
+
+    python -m benchmarks.ledger_delta --rows 1000000 --append 10000
+
+Builds a hash-linked ledger, then compares the transfer size and the
+central ingest rate of (a) copying booth_ledger_1.db into BASE_DIR and
+running the incremental engine on it with (b) exporting a delta file and
+importing it. --append votes are then added at the booth to compare a
+catch-up transfer: the whole .db again vs. a delta after the watermark.
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+import central_verification
+from benchmarks.synthetic_ledgers import START, use_base_dir
+from blockchain import Blockchain
+from ledger_delta import export_delta
+from ledger_writer import GROUP, LedgerWriter
+
+
+def append_chain(db_name, chain, rows, rng, clock):
+    writer = LedgerWriter(db_name, durability=GROUP, group_size=50000, group_interval_ms=1000)
+    for _ in range(rows):
+        clock += timedelta(microseconds=rng.randrange(50000))
+        voter_hash = hashlib.sha256(f"VOTER{rng.randrange(10 ** 9)}".encode()).hexdigest()
+        block = chain.add_block(voter_hash, clock.isoformat(timespec="microseconds"))
+        writer.save_vote(block.index, voter_hash, block.timestamp,
+                         previous_hash=block.previous_hash, block_hash=block.hash)
+    writer.close()
+    return clock
+
+
+def db_size(path):
+    return sum(os.path.getsize(name) for name in (path, path + "-wal") if os.path.exists(name))
+
+
+def report(label, size, rows, seconds):
+    print(f"{label:26} {size / 1e6:9.1f} MB {size / rows:7.1f} B/row "
+          f"{seconds:7.2f}s {rows / seconds:10.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--append", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        booth_dir, copy_dir, import_dir = (os.path.join(tmp, name) for name in ("booth", "copy", "import"))
+        for directory in (booth_dir, copy_dir, import_dir):
+            os.mkdir(directory)
+        ledger = os.path.join(booth_dir, "booth_ledger_1.db")
+        chain = Blockchain()
+        clock = append_chain(ledger, chain, args.rows, rng, START)
+
+        for label, rows, after_id in (("full", args.rows, 0), ("catch-up", args.append, args.rows)):
+            if after_id:
+                clock = append_chain(ledger, chain, rows, rng, clock)
+            print(f"{label}: {rows} rows")
+
+            # (a) copy the ledger file, ingest it from BASE_DIR
+            use_base_dir(copy_dir)
+            start = time.perf_counter()
+            shutil.copy(ledger, os.path.join(copy_dir, "booth_ledger_1.db"))
+            copied = time.perf_counter() - start
+            start = time.perf_counter()
+            copy_result = central_verification.ingest_new_votes()
+            report("  copy .db", db_size(ledger), rows, copied)
+            report("  ingest from .db", db_size(ledger), rows, time.perf_counter() - start)
+
+            # (b) export a delta, import it into a separate central DB
+            use_base_dir(import_dir)
+            delta = os.path.join(tmp, f"{label}.obvd")
+            start = time.perf_counter()
+            export_delta(ledger, delta, after_id=after_id)
+            report("  export delta", os.path.getsize(delta), rows, time.perf_counter() - start)
+            start = time.perf_counter()
+            import_result = central_verification.import_ledger_delta(delta)
+            report("  import delta", os.path.getsize(delta), rows, time.perf_counter() - start)
+
+            same = all(copy_result[key] == import_result[key]
+                       for key in ("total_votes", "valid_votes", "duplicate_votes"))
+            print(f"  totals {'identical' if same else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    main()
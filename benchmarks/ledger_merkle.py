@@ -0,0 +1,111 @@
+"""Merkle-tree diff of two booth ledgers vs. a row-by-row comparison.
+
+    python -m benchmarks.ledger_merkle --rows 1000000 --tamper 0 1 10
+
+Builds a ledger through LedgerWriter (which maintains the tree), copies
+it and alters --tamper rows of the copy, first leaving its stored tree as
+it was: /ledger_audit (audit_ledger_copies, an O(n) rebuild) must report
+that tree stale. The copy's tree is then rebuilt over the altered rows,
+as a forger would, and the copy checked the way /ledger_integrity checks
+it (check_ledger_integrity: both stored trees walked) and compared row by
+row. Exits non-zero unless the audit flags every altered copy and the
+check finds exactly the altered rows.
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import central_verification
+from benchmarks.chain_resume import build_ledger
+from benchmarks.synthetic_ledgers import use_base_dir
+from ledger_merkle import audit_merkle, update_merkle
+
+
+def compare_rows(path_a, path_b):
+    """The alternative: read both ledgers in id order and compare every row."""
+    query = "SELECT * FROM booth_ledger ORDER BY id"
+    a = sqlite3.connect(path_a).execute(query)
+    b = sqlite3.connect(path_b).execute(query)
+    differing = 0
+    while True:
+        rows_a, rows_b = a.fetchmany(10000), b.fetchmany(10000)
+        if not rows_a and not rows_b:
+            return differing
+        differing += sum(1 for row_a, row_b in zip(rows_a, rows_b) if row_a != row_b)
+        differing += abs(len(rows_a) - len(rows_b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--tamper", type=int, nargs="+", default=[0, 1, 10])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original_dir = os.path.join(tmp, "original")
+        os.mkdir(original_dir)
+        original = os.path.join(original_dir, "booth_ledger_1.db")
+        start = time.perf_counter()
+        build_ledger(original, args.rows)
+        print(f"built {args.rows} rows with the tree in {time.perf_counter() - start:.1f}s")
+
+        conn = sqlite3.connect(original)
+        nodes = conn.execute("SELECT COUNT(*) FROM merkle_nodes").fetchone()[0]
+        start = time.perf_counter()
+        audit_merkle(conn)
+        print(f"{nodes} tree nodes; full rebuild from rows (audit) "
+              f"{time.perf_counter() - start:.2f}s")
+        conn.close()
+
+        rng = random.Random(0)
+        print(f"{'altered':>8} {'stored tree':>12} {'audit ms':>9} {'found':>6} "
+              f"{'comparisons':>12} {'check ms':>9} {'row-by-row ms':>14}")
+        for count in args.tamper:
+            # A fresh directory per copy: a -wal left by one copy must not
+            # be picked up by the next.
+            copy_dir = os.path.join(tmp, f"copy_{count}")
+            os.mkdir(copy_dir)
+            copy = os.path.join(copy_dir, "booth_ledger_1.db")
+            shutil.copy(original, copy)
+            conn = sqlite3.connect(copy)
+            altered = rng.sample(range(1, args.rows + 1), count)
+            for ledger_id in altered:
+                conn.execute("UPDATE booth_ledger SET timestamp = 'altered' WHERE id = ?", (ledger_id,))
+            conn.commit()
+            conn.close()
+
+            use_base_dir(copy_dir)
+            start = time.perf_counter()
+            (audit,) = central_verification.audit_ledger_copies().values()
+            audit_ms = 1000 * (time.perf_counter() - start)
+            if audit["stored_tree_matches"] != (count == 0):
+                raise SystemExit(f"audit of {count} altered rows: {audit}")
+
+            conn = sqlite3.connect(copy)
+            conn.execute("DELETE FROM merkle_nodes")
+            conn.execute("DELETE FROM merkle_state")
+            update_merkle(conn)
+            conn.commit()
+            conn.close()
+
+            start = time.perf_counter()
+            (result,) = central_verification.check_ledger_integrity(original_dir).values()
+            check_ms = 1000 * (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            compare_rows(original, copy)
+            rows_ms = 1000 * (time.perf_counter() - start)
+            stored = "matches" if audit["stored_tree_matches"] else "stale"
+            print(f"{count:8} {stored:>12} {audit_ms:9.0f} {result['difference_count']:6} "
+                  f"{result['comparisons']:12} {check_ms:9.0f} {rows_ms:14.0f}")
+            if (sorted(result["differing_ids"]) != sorted(altered)[:len(result["differing_ids"])]
+                    or result["difference_count"] != count):
+                raise SystemExit(f"altered ids {sorted(altered)[:10]} not reported: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Votes/sec of the booth ledger under each durability policy.
+
+    python -m benchmarks.ledger_writer --votes 2000
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from ledger_writer import GROUP, LEDGER_SCHEMA, STRICT, LedgerWriter
+
+
+def make_votes(n):
+    return [
+        (i + 1, hashlib.sha256(str(i).encode()).hexdigest(), datetime.now().isoformat())
+        for i in range(n)
+    ]
+
+
+def run_legacy(db_name, votes):
+    # The original save_vote_to_db: connect, insert, commit, close per vote.
+    db = sqlite3.connect(db_name)
+    db.execute(LEDGER_SCHEMA)
+    db.commit()
+    db.close()
+
+    start = time.perf_counter()
+    for vote in votes:
+        db = sqlite3.connect(db_name)
+        db.execute("""
+            INSERT INTO booth_ledger (vote_count, voter_hash, timestamp)
+            VALUES (?, ?, ?)
+        """, vote)
+        db.commit()
+        db.close()
+    return time.perf_counter() - start
+
+
+def run_writer(db_name, votes, **kwargs):
+    writer = LedgerWriter(db_name, **kwargs)
+    start = time.perf_counter()
+    seq = 0
+    for vote in votes:
+        seq = writer.save_vote(*vote)
+    writer.wait_durable(seq)
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--votes", type=int, default=2000)
+    args = parser.parse_args()
+
+    votes = make_votes(args.votes)
+    cases = [
+        ("legacy (connect+commit per vote)", run_legacy, {}),
+        ("WAL strict", run_writer, {"durability": STRICT}),
+        ("WAL group 64 / 20 ms", run_writer, {"durability": GROUP}),
+        ("WAL group 256 / 50 ms", run_writer,
+         {"durability": GROUP, "group_size": 256, "group_interval_ms": 50}),
+    ]
+
+    print(f"{'policy':36} {'seconds':>9} {'votes/sec':>11}")
+    for label, runner, kwargs in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = runner(os.path.join(tmp, "bench.db"), votes, **kwargs)
+        print(f"{label:36} {elapsed:9.3f} {len(votes) / elapsed:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Bulk voter import into OBVV_QRCODE/app.py vs. one /add form post per voter.
+
+    python -m benchmarks.qr_import --voters 100000
+
+Runs the app in a temp directory (its own voters.db) and uploads a
+--voters CSV to /import. The rate is for the whole request: parse,
+validate, encrypt every voter's token and insert in one transaction.
+QR images are rendered later, on demand (see benchmarks/qr_serving.py).
+"""
+import argparse
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+QR_APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OBVV_QRCODE")
+
+
+def load_app(work_dir):
+    """Import OBVV_QRCODE/app.py with `work_dir` as its working directory."""
+    shutil.copy(os.path.join(QR_APP_DIR, "booth_secret.key"), work_dir)
+    with open(os.path.join(QR_APP_DIR, "schema.sql")) as schema:
+        conn = sqlite3.connect(os.path.join(work_dir, "voters.db"))
+        conn.executescript(schema.read())
+        conn.close()
+    os.chdir(work_dir)
+    sys.path.insert(0, QR_APP_DIR)
+    import app
+    return app
+
+
+def voter_csv(first, count):
+    rows = ["voter_id,name"]
+    rows.extend(f"VTR{n:07d},Voter Number {n}" for n in range(first, first + count))
+    return "\n".join(rows).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=100000)
+    parser.add_argument("--form-posts", type=int, default=50)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            app = load_app(tmp)
+            client = app.app.test_client()
+
+            start = time.perf_counter()
+            for n in range(args.form_posts):
+                client.post("/add", data={"voter_id": f"FRM{n:07d}", "name": f"Form Voter {n}"})
+            elapsed = time.perf_counter() - start
+            print(f"/add form posts  : {args.form_posts / elapsed:8.1f} voters/s "
+                  f"({1000 * elapsed / args.form_posts:.1f} ms each)")
+
+            body = voter_csv(0, args.voters)
+            start = time.perf_counter()
+            response = client.post("/import", data={"file": (io.BytesIO(body), "voters.csv")},
+                                   content_type="multipart/form-data")
+            elapsed = time.perf_counter() - start
+            reply = response.get_json()
+            print(f"/import          : {reply['imported']} voters in {elapsed:.2f}s, "
+                  f"{reply['imported'] / elapsed:8.0f} voters/s (HTTP {response.status_code})")
+            print(f"voters.db        : {os.path.getsize('voters.db') / reply['imported']:.0f} bytes/voter")
+
+            rejected = client.post("/import", data={"file": (io.BytesIO(body), "voters.csv")},
+                                   content_type="multipart/form-data")
+            print(f"re-upload        : HTTP {rejected.status_code}, "
+                  f"{rejected.get_json()['error_count']} errors, nothing inserted")
+
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
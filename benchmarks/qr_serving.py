@@ -0,0 +1,149 @@
+"""Voter QR images: one PNG file per voter vs. on-demand rendering from tokens.
+
+    python -m benchmarks.qr_serving --voters 2000 --clients 16 --requests 200
+
+Imports --voters voters into OBVV_QRCODE/app.py (a temp directory), then
+writes the old file-per-voter static/qrs/<voter_id>.png for each of them
+and compares disk use with what the stored tokens add to voters.db.
+--clients keep-alive HTTP/1.1 clients then fetch --requests random
+voters' QR each from a local threaded server, per mode:
+
+  static  the PNG file through Flask's static route (the old layout)
+  cold    /qr/<voter_id>.png with an empty cache: every request renders
+  warm    /qr/<voter_id>.png with every voter pre-rendered in the LRU
+  304     /qr/<voter_id>.png revalidated with If-None-Match
+"""
+import argparse
+import http.client
+import io
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server
+
+from benchmarks.qr_import import load_app, voter_csv
+
+
+def percentile_ms(samples, p):
+    ordered = sorted(samples)
+    return 1000 * ordered[min(len(ordered) * p // 100, len(ordered) - 1)]
+
+
+def disk_bytes(path):
+    return os.stat(path).st_blocks * 512
+
+
+def run_client(port, paths, etags, latencies, start_event):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    start_event.wait()
+    for path in paths:
+        headers = {"If-None-Match": etags[path]} if etags else {}
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status not in (200, 304):
+            raise RuntimeError(f"{path}: HTTP {response.status}")
+    conn.close()
+
+
+def load_test(port, voter_ids, prefix, args, etags=None):
+    rng = random.Random(0)
+    latencies, start_event = [], threading.Event()
+    threads = []
+    for _ in range(args.clients):
+        paths = [f"{prefix}{rng.choice(voter_ids)}.png" for _ in range(args.requests)]
+        threads.append(threading.Thread(
+            target=run_client, args=(port, paths, etags, latencies, start_event)
+        ))
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            app = load_app(tmp)
+            client = app.app.test_client()
+            empty_db = os.path.getsize(app.DB_NAME)
+            client.post("/import", data={"file": (io.BytesIO(voter_csv(0, args.voters)), "voters.csv")},
+                        content_type="multipart/form-data")
+
+            db = app.get_db()
+            rows = db.execute("SELECT voter_id, qr_token FROM voters ORDER BY voter_id").fetchall()
+            token_bytes = db.execute("SELECT SUM(LENGTH(qr_token)) FROM voters").fetchone()[0]
+            db.close()
+            voter_ids = [voter_id for voter_id, _ in rows]
+
+            # The old layout, rendered from the same tokens (this also warms the cache).
+            start = time.perf_counter()
+            pngs = app.render_qrs([token for _, token in rows])
+            render_seconds = time.perf_counter() - start
+            app.app.static_folder = os.path.join(tmp, "static")
+            for voter_id, png in zip(voter_ids, pngs):
+                with open(os.path.join(app.QR_FOLDER, f"{voter_id}.png"), "wb") as f:
+                    f.write(png)
+
+            files = [os.path.join(app.QR_FOLDER, f"{voter_id}.png") for voter_id in voter_ids]
+            file_disk = sum(disk_bytes(path) for path in files)
+            file_size = sum(os.path.getsize(path) for path in files)
+            print(f"voters           : {args.voters}, rendered in {render_seconds:.1f}s "
+                  f"({args.voters / render_seconds:.0f} QR/s, {app.RENDER_WORKERS} workers)")
+            print(f"file per voter   : {file_disk / 1e6:8.2f} MB on disk "
+                  f"({file_size / args.voters:.0f} B/file, {file_disk / args.voters:.0f} B/voter in blocks)")
+            print(f"tokens in db     : {token_bytes / 1e6:8.2f} MB of tokens "
+                  f"({token_bytes / args.voters:.0f} B/voter), voters.db grew "
+                  f"{(os.path.getsize(app.DB_NAME) - empty_db) / 1e6:.2f} MB with the rest of the rows")
+            print(f"LRU              : {app.qr_cache.size / 1e6:8.2f} MB in memory for all {args.voters} images "
+                  f"(cap {app.QR_CACHE_BYTES / 1e6:.0f} MB)")
+
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)
+            WSGIRequestHandler.protocol_version = "HTTP/1.1"
+            BaseWSGIServer.request_queue_size = 4096
+            server = make_server("127.0.0.1", 0, app.app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            port = server.server_port
+
+            warm_cache = app.qr_cache
+            etags = {}
+            for voter_id in voter_ids:
+                path = f"/qr/{voter_id}.png"
+                etags[path] = client.get(path).headers["ETag"]
+
+            modes = [
+                ("static", "/static/qrs/", warm_cache, None),
+                ("cold", "/qr/", app.QRCache(0), None),
+                ("warm", "/qr/", warm_cache, None),
+                ("304", "/qr/", warm_cache, etags),
+            ]
+            for name, prefix, cache, mode_etags in modes:
+                app.qr_cache = cache
+                rate, latencies = load_test(port, voter_ids, prefix, args, mode_etags)
+                print(f"{name:<7}: {rate:7.0f} req/s, p50 {percentile_ms(latencies, 50):7.1f} ms, "
+                      f"p99 {percentile_ms(latencies, 99):7.1f} ms")
+            server.shutdown()
+
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Synthetic booth_ledger_*.db files for central verification benchmarks."""
+import hashlib
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import central_verification
+from ledger_writer import LEDGER_SCHEMA
+
+START = datetime(2026, 2, 5, 7, 0, 0)
+
+
+def voter_hash(n):
+    return hashlib.sha256(f"VOTER{n:09d}OBVV_SECURE_SALT".encode()).hexdigest()
+
+
+def build_booth_ledgers(base_dir, booths, rows_per_booth, duplicate_rate=0.01, seed=0):
+    """Write `booths` ledgers of `rows_per_booth` votes each.
+
+    A `duplicate_rate` share of votes reuse a voter that already voted
+    somewhere. Returns the number of distinct voters.
+    """
+    rng = random.Random(seed)
+    next_voter = 0
+
+    for booth in range(1, booths + 1):
+        conn = sqlite3.connect(os.path.join(base_dir, f"booth_ledger_{booth}.db"))
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(LEDGER_SCHEMA)
+
+        rows = []
+        for i in range(rows_per_booth):
+            if next_voter and rng.random() < duplicate_rate:
+                n = rng.randrange(next_voter)
+            else:
+                n = next_voter
+                next_voter += 1
+            timestamp = (START + timedelta(milliseconds=rng.randrange(12 * 3600 * 1000)))
+            rows.append((i + 1, voter_hash(n), timestamp.isoformat(timespec="microseconds")))
+            if len(rows) == 100000:
+                append_rows(conn, rows)
+                rows = []
+        append_rows(conn, rows)
+        conn.close()
+
+    return next_voter
+
+
+def append_rows(conn, rows):
+    conn.executemany("""
+        INSERT INTO booth_ledger (vote_count, voter_hash, timestamp)
+        VALUES (?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+def append_votes(base_dir, booth, voter_numbers):
+    conn = sqlite3.connect(os.path.join(base_dir, f"booth_ledger_{booth}.db"))
+    start = conn.execute("SELECT COALESCE(MAX(vote_count), 0) FROM booth_ledger").fetchone()[0]
+    append_rows(conn, [
+        (start + i + 1, voter_hash(n), datetime.now().isoformat(timespec="microseconds"))
+        for i, n in enumerate(voter_numbers)
+    ])
+    conn.close()
+
+
+def use_base_dir(base_dir):
+    """Point central_verification at `base_dir` with a fresh central DB."""
+    central_verification.BASE_DIR = base_dir
+    central_verification.CENTRAL_DB = os.path.join(base_dir, "central_duplicates.db")
+    central_verification.BOOTH_KEYS_DIR = os.path.join(base_dir, "booth_keys")
+    central_verification.init_central_db()
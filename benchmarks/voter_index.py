@@ -0,0 +1,65 @@
+"""Startup time and memory of the in-booth voter index.
+
+    python -m benchmarks.voter_index --rows 1000000
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from ledger_writer import LEDGER_SCHEMA
+from voter_index import VoterIndex
+
+
+def build_ledger(db_name, rows):
+    conn = sqlite3.connect(db_name)
+    conn.execute(LEDGER_SCHEMA)
+    conn.executemany("""
+        INSERT INTO booth_ledger (vote_count, voter_hash, timestamp)
+        VALUES (?, ?, ?)
+    """, (
+        (i + 1, hashlib.sha256(str(i).encode()).hexdigest(), "2026-02-05T21:41:56.958952")
+        for i in range(rows)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "booth_ledger_bench.db")
+        build_ledger(db_name, args.rows)
+
+        for use_bloom in (False, True):
+            start = time.perf_counter()
+            index = VoterIndex.from_ledger(db_name, use_bloom=use_bloom)
+            elapsed = time.perf_counter() - start
+            del index
+
+            # Measured separately: tracemalloc slows loading several-fold.
+            tracemalloc.start()
+            index = VoterIndex.from_ledger(db_name, use_bloom=use_bloom)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            probe = hashlib.sha256(b"not-a-voter").hexdigest()
+            start = time.perf_counter()
+            for _ in range(100000):
+                probe in index
+            lookup_us = (time.perf_counter() - start) * 10
+
+            label = "set + bloom" if use_bloom else "set only"
+            print(f"{label:12} rows={len(index)} load={elapsed:.2f}s "
+                  f"memory={current / 1e6:.1f}MB lookup={lookup_us:.2f}us")
+            del index
+
+
+if __name__ == "__main__":
+    main()
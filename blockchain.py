@@ -0,0 +1,312 @@
+import hashlib
+import sqlite3
+import struct
+from collections import deque
+from datetime import datetime, timedelta
+
+VERIFY_CHUNK = 10000
+MAX_REPORTED_PROBLEMS = 100
+GENESIS_PREVIOUS_HASH = "0" * 64
+GENESIS_VOTER_HASH = "0" * 64
+# Fixed, so every booth's chain starts from the same genesis hash and a
+# verifier can check that a ledger's first block follows it.
+GENESIS_TIMESTAMP = "1970-01-01T00:00:00.000000"
+
+# Blocks kept in memory; older ones are read back from the ledger on demand.
+# Measured with benchmarks/block_memory.py: ~450 bytes per block with the
+# original __dict__ + hex/ISO strings, ~195 bytes packed into one slot.
+CHAIN_WINDOW = 256
+
+EPOCH = datetime(1970, 1, 1)
+BLOCK_LAYOUT = struct.Struct("<qq?32s32s32s")
+
+
+# BLOCKCHAIN (HASH-LINKED)
+
+class Block:
+    # One packed bytes object per block: index, integer timestamp, and the
+    # voter / previous / block SHA-256 digests in binary.
+    __slots__ = ("_packed",)
+
+    def __init__(self, index, timestamp, voter_hash, previous_hash, stored_hash=None):
+        ts_micros = iso_to_micros(timestamp)
+        # Hash the canonical form so the stored row and the block agree.
+        timestamp = micros_to_iso(ts_micros)
+        # A block read back from the ledger keeps the hash it was written
+        # with; older rows may hash a timestamp in another ISO form.
+        if not stored_hash:
+            stored_hash = block_hash(index, timestamp, voter_hash, previous_hash)
+        self._packed = BLOCK_LAYOUT.pack(
+            index,
+            ts_micros,
+            # Rows written before hash links existed have no previous hash.
+            bool(previous_hash),
+            bytes.fromhex(voter_hash),
+            bytes.fromhex(previous_hash or GENESIS_PREVIOUS_HASH),
+            bytes.fromhex(stored_hash),
+        )
+
+    @property
+    def index(self):
+        return BLOCK_LAYOUT.unpack(self._packed)[0]
+
+    @property
+    def ts_micros(self):
+        return BLOCK_LAYOUT.unpack(self._packed)[1]
+
+    @property
+    def timestamp(self):
+        return micros_to_iso(self.ts_micros)
+
+    @property
+    def voter_hash(self):
+        return BLOCK_LAYOUT.unpack(self._packed)[3].hex()
+
+    @property
+    def previous_hash(self):
+        _, _, linked, _, previous, _ = BLOCK_LAYOUT.unpack(self._packed)
+        return previous.hex() if linked else ""
+
+    @property
+    def hash(self):
+        return BLOCK_LAYOUT.unpack(self._packed)[5].hex()
+
+    def compute_hash(self):
+        return block_hash(self.index, self.timestamp, self.voter_hash, self.previous_hash)
+
+
+class Blockchain:
+    def __init__(self, tip=None, db_name=None, window=CHAIN_WINDOW):
+        self.db_name = db_name
+        self.chain = deque(maxlen=window)
+        if tip is None:
+            self.create_genesis_block()
+        else:
+            self.chain.append(tip)
+
+    @classmethod
+    def resume(cls, db_name, window=CHAIN_WINDOW):
+        """Continue from the tip persisted in `db_name` (O(1), no replay)."""
+        return cls(tip=load_chain_tip(db_name), db_name=db_name, window=window)
+
+    def create_genesis_block(self):
+        self.chain.append(genesis_block())
+
+    def get_latest_block(self):
+        return self.chain[-1]
+
+    def get_block(self, index):
+        oldest = self.chain[0].index
+        if oldest <= index <= self.chain[-1].index:
+            return self.chain[index - oldest]
+        if self.db_name is None:
+            raise IndexError(f"Block {index} is outside the in-memory window")
+        return load_block(self.db_name, index)
+
+    def next_block(self, voter_hash, timestamp):
+        """The block that would follow the tip; the chain is left unchanged."""
+        previous_block = self.get_latest_block()
+        return Block(
+            index=previous_block.index + 1,   # ORDER / COUNT
+            timestamp=timestamp,
+            voter_hash=voter_hash,
+            previous_hash=previous_block.hash
+        )
+
+    def append_block(self, block):
+        self.chain.append(block)
+
+    def add_block(self, voter_hash, timestamp):
+        new_block = self.next_block(voter_hash, timestamp)
+        self.append_block(new_block)
+        return new_block
+
+
+def genesis_block():
+    return Block(
+        index=0,
+        timestamp=GENESIS_TIMESTAMP,
+        voter_hash=GENESIS_VOTER_HASH,
+        previous_hash=GENESIS_PREVIOUS_HASH
+    )
+
+
+def block_hash(index, timestamp, voter_hash, previous_hash):
+    return hashlib.sha256(
+        f"{index}|{timestamp}|{voter_hash}|{previous_hash}".encode()
+    ).hexdigest()
+
+
+def iso_to_micros(timestamp):
+    return (datetime.fromisoformat(timestamp) - EPOCH) // timedelta(microseconds=1)
+
+
+def micros_to_iso(ts_micros):
+    return (EPOCH + timedelta(microseconds=ts_micros)).isoformat(timespec="microseconds")
+
+
+# ===================== PERSISTED TIP =====================
+
+def load_chain_tip(db_name):
+    """Return the last persisted Block, or None for an empty ledger."""
+    conn = sqlite3.connect(db_name)
+    try:
+        try:
+            tip = conn.execute("""
+                SELECT l.vote_count, l.timestamp, l.voter_hash, l.previous_hash, t.block_hash
+                FROM chain_tip t JOIN booth_ledger l ON l.id = t.ledger_id
+                WHERE t.id = 1
+            """).fetchone()
+        except sqlite3.OperationalError:
+            tip = None
+
+        if tip is None:
+            # Ledger written before chain_tip existed: one-off scan for the
+            # highest vote_count so resumed indexes never collide with it.
+            try:
+                last = conn.execute("""
+                    SELECT timestamp, voter_hash FROM booth_ledger
+                    ORDER BY id DESC LIMIT 1
+                """).fetchone()
+            except sqlite3.OperationalError:
+                return None
+            if last is None:
+                return None
+            max_count = conn.execute("SELECT MAX(vote_count) FROM booth_ledger").fetchone()[0]
+            tip = (max_count, last[0], last[1], None, None)
+    finally:
+        conn.close()
+
+    vote_count, timestamp, voter_hash, previous_hash, stored_hash = tip
+    return Block(
+        index=vote_count,
+        timestamp=timestamp,
+        voter_hash=voter_hash,
+        previous_hash=previous_hash or "",
+        stored_hash=stored_hash
+    )
+
+
+def load_block(db_name, index):
+    conn = sqlite3.connect(db_name)
+    try:
+        row = conn.execute("""
+            SELECT vote_count, timestamp, voter_hash, previous_hash, block_hash
+            FROM booth_ledger WHERE vote_count = ?
+            ORDER BY id DESC LIMIT 1
+        """, (index,)).fetchone()
+    finally:
+        conn.close()
+
+    if row is None:
+        raise IndexError(f"Block {index} is not in {db_name}")
+    vote_count, timestamp, voter_hash, previous_hash, stored_hash = row
+    return Block(
+        index=vote_count,
+        timestamp=timestamp,
+        voter_hash=voter_hash,
+        previous_hash=previous_hash or "",
+        stored_hash=stored_hash
+    )
+
+
+def verify_chain(db_name, since=None, chunk_size=VERIFY_CHUNK):
+    """Check hash links and block hashes of a booth ledger.
+
+    `since` is the `checkpoint` returned by a previous call; only rows after
+    it are read, so re-validation costs time proportional to the new rows.
+    Memory stays bounded either way. A ledger's first block must be block 1
+    linked to the genesis block, and every linked block must follow the one
+    before it by index and hash, so rows cut from the start are caught too.
+    Rows written before blocks were linked (no block_hash) are counted as
+    `unlinked`, may restart their count, and anchor the next block.
+    """
+    conn = sqlite3.connect(db_name)
+    problems = []
+    problem_count = 0
+
+    def report(ledger_id, reason):
+        nonlocal problem_count
+        problem_count += 1
+        if len(problems) < MAX_REPORTED_PROBLEMS:
+            problems.append((ledger_id, reason))
+
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(booth_ledger)")}
+        # A ledger not yet reopened by a booth since hash links were added
+        # has no link columns; treat every row as unlinked.
+        linked = "block_hash" in columns
+        link_columns = "previous_hash, block_hash" if linked else "NULL, NULL"
+
+        start_id = 0
+        expected_previous = genesis_block().hash
+        expected_index = 1
+        # A checkpoint taken on an empty ledger (id 0) has no block to
+        # re-check: verification starts from the genesis block again.
+        if since is not None and since[0]:
+            start_id, expected_previous = since
+            row = conn.execute(f"""
+                SELECT {"block_hash" if linked else "NULL"}, vote_count
+                FROM booth_ledger WHERE id = ?
+            """, (start_id,)).fetchone()
+            if row is None or row[0] != expected_previous:
+                report(start_id, "checkpoint block changed")
+            # An unlinked checkpoint row anchors the next block, like any
+            # unlinked row.
+            expected_index = row[1] + 1 if row and expected_previous is not None else None
+
+        try:
+            tip = conn.execute("""
+                SELECT ledger_id, block_hash FROM chain_tip WHERE id = 1
+            """).fetchone()
+        except sqlite3.OperationalError:
+            tip = None
+
+        cursor = conn.execute(f"""
+            SELECT id, vote_count, voter_hash, timestamp, {link_columns}
+            FROM booth_ledger WHERE id > ? ORDER BY id
+        """, (start_id,))
+
+        blocks = 0
+        unlinked = 0
+        index_breaks = 0
+        last_id, last_hash = start_id, since[1] if since is not None else None
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for ledger_id, index, voter_hash, timestamp, previous_hash, stored_hash in rows:
+                blocks += 1
+                if stored_hash is None:
+                    unlinked += 1
+                    expected_previous = expected_index = None
+                else:
+                    if expected_index is not None and index != expected_index:
+                        index_breaks += 1
+                        report(ledger_id, "index break")
+                    if expected_previous is not None and previous_hash != expected_previous:
+                        report(ledger_id, "broken link")
+                    if block_hash(index, timestamp, voter_hash, previous_hash) != stored_hash:
+                        report(ledger_id, "block hash mismatch")
+                    expected_previous = stored_hash
+                    expected_index = index + 1
+                last_id, last_hash = ledger_id, stored_hash
+    finally:
+        conn.close()
+
+    tip_matches = None
+    if tip is not None:
+        tip_matches = tip == (last_id, last_hash)
+
+    valid = problem_count == 0 and tip_matches is not False
+    return {
+        "valid": valid,
+        "blocks": blocks,
+        "unlinked": unlinked,
+        "index_breaks": index_breaks,
+        "tip_matches": tip_matches,
+        "problem_count": problem_count,
+        "problems": problems,
+        # Only advance past rows that verified cleanly.
+        "checkpoint": (last_id, last_hash) if valid else since,
+    }
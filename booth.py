@@ -0,0 +1,399 @@
+import argparse
+import hashlib
+import multiprocessing
+import queue
+import time
+from collections import deque
+from datetime import datetime
+
+from cryptography.fernet import Fernet
+
+from blockchain import Blockchain, verify_chain
+from booth_sync import SyncAgent
+from ledger_delta import read_push_key
+from ledger_writer import GROUP, STRICT, LedgerWriter
+from frame_sources import open_source
+from qr_scanner import ADAPTIVE, FULL_FRAME, QRScanner, make_detector
+from voter_index import VoterIndex
+
+
+# DEFAULTS (override on the command line)
+
+KEY_PATH = "booth_secret.key"
+
+# "strict" fsyncs every vote before it is confirmed; "group" batches commits
+# (see ledger_writer.py) and waits for the batch before confirming.
+DURABILITY = STRICT
+
+# Re-walk the whole ledger on startup instead of trusting the chain_tip row.
+VERIFY_ON_START = False
+
+DECODER_WORKERS = 1
+# "full" decodes every full-resolution frame; "adaptive" uses grayscale,
+# downscaling and the last QR region (see qr_scanner.py).
+DETECTION = FULL_FRAME
+
+# Host mode scans continuously; ignore the same card on a lane for this long.
+REPEAT_WINDOW = 5.0
+
+# Central server to push committed votes to (see booth_sync.py); None = offline.
+SYNC_URL = None
+# Key pushes are signed with; the central server keeps a copy as
+# booth_keys/<ledger file name>.key.
+SYNC_KEY_PATH = "sync_secret.key"
+
+
+# ===================== HELPER FUNCTIONS =====================
+
+def load_key(key_path=KEY_PATH):
+    with open(key_path, "rb") as key_file:
+        return key_file.read()
+
+
+def hash_voter_id(voter_id):
+    salt = "OBVV_SECURE_SALT"
+    return hashlib.sha256((voter_id + salt).encode()).hexdigest()
+
+
+def ledger_path_for(booth_id):
+    return f"booth_ledger_{booth_id}.db"
+
+
+class BoothRecorder:
+    """Voter hash -> duplicate check -> block -> ledger, for one booth ledger."""
+
+    def __init__(self, db_name, durability=DURABILITY, verify_on_start=VERIFY_ON_START,
+                 sync_url=SYNC_URL, sync_key_path=SYNC_KEY_PATH):
+        self.db_name = db_name
+        self.ledger = LedgerWriter(db_name, durability=durability)
+        if verify_on_start:
+            print("Ledger verification:", verify_chain(db_name))
+        self.voted = VoterIndex.from_ledger(db_name)
+        self.chain = Blockchain.resume(db_name)
+        self.sync = None
+        if sync_url:
+            self.sync = SyncAgent(db_name, sync_url, read_push_key(sync_key_path))
+            self.sync.start()
+
+    def record(self, voter_id):
+        """Record a vote durably and return its Block, or None if already voted here."""
+        block, seq = self.queue_vote(voter_id)
+        if block is not None:
+            self.ledger.wait_durable(seq)
+        return block
+
+    def queue_vote(self, voter_id):
+        """Like record() but returns (block, seq) without waiting for the commit."""
+        voter_hash = hash_voter_id(voter_id)
+        if voter_hash in self.voted:
+            return None, None
+
+        new_block = self.chain.next_block(voter_hash, datetime.now().isoformat())
+        seq = self.ledger.save_vote(
+            vote_count=new_block.index,
+            voter_hash=voter_hash,
+            timestamp=new_block.timestamp,
+            previous_hash=new_block.previous_hash,
+            block_hash=new_block.hash
+        )
+        # Only once the ledger took it: a failed strict commit raises above
+        # and leaves the in-memory chain matching the ledger.
+        self.chain.append_block(new_block)
+        self.voted.add(voter_hash)
+        return new_block, seq
+
+    def close(self):
+        self.ledger.close()
+        if self.sync is not None:
+            self.sync.stop()
+            print("Sync stats:", self.sync.stats())
+
+
+def print_recorded(block, lane=None):
+    prefix = "" if lane is None else f"[lane {lane}] "
+    print(f"{prefix}✅ Vote recorded successfully")
+    print(f"{prefix}Vote Count :", block.index)
+    print(f"{prefix}Timestamp  :", block.timestamp)
+
+
+# ===================== SINGLE BOOTH =====================
+
+def run_booth(booth_id, camera_index=0, ledger_path=None, key_path=KEY_PATH,
+              durability=DURABILITY, detection=DETECTION, decoder_workers=DECODER_WORKERS,
+              verify_on_start=VERIFY_ON_START, sync_url=SYNC_URL, sync_key_path=SYNC_KEY_PATH):
+    ledger_path = ledger_path or ledger_path_for(booth_id)
+    cipher = Fernet(load_key(key_path))
+    recorder = BoothRecorder(
+        ledger_path, durability=durability, verify_on_start=verify_on_start, sync_url=sync_url,
+        sync_key_path=sync_key_path
+    )
+
+    scanner = QRScanner(
+        cipher,
+        camera_index=camera_index,
+        decoder_workers=decoder_workers,
+        detection=detection
+    )
+    scanner.start()
+
+    mode = f"syncing to {sync_url}" if sync_url else "Offline"
+    print(f"OBVV Polling Booth {booth_id} Started ({mode})")
+    print("Resuming at block", recorder.chain.get_latest_block().index)
+
+    while True:
+        print("\nPress ENTER to scan QR or type 'exit' to stop:")
+        cmd = input()
+
+        if cmd.lower() == "exit":
+            break
+
+        print("QR Scanner ready. Show QR to camera (press 'q' to cancel).")
+        voter = scanner.next_voter()
+
+        if voter is None:
+            print("QR scan cancelled or failed.")
+            continue
+
+        block = recorder.record(voter["voter_id"])
+        if block is None:
+            print("🚫 Already voted at this booth - vote refused")
+            continue
+
+        print_recorded(block)
+
+    scanner.stop()
+    recorder.close()
+    print("\nScanner stats:", scanner.stats())
+    print("\nLedger stored in SQL database:", ledger_path)
+
+
+# ===================== HOST MODE (SEVERAL LANES) =====================
+
+def lane_worker(lane_id, camera_index, key, detection, results, stop):
+    """Capture + decode + decrypt for one camera, in its own process."""
+    scanner = QRScanner(
+        Fernet(key),
+        camera_index=camera_index,
+        detection=detection,
+        show_preview=False
+    )
+    scanner.start()
+    last_voter, last_seen = None, 0.0
+    try:
+        while not stop.is_set():
+            voter = scanner.next_voter(timeout=0.5)
+            if voter is None:
+                continue
+            now = time.monotonic()
+            if voter == last_voter and now - last_seen < REPEAT_WINDOW:
+                continue
+            last_voter, last_seen = voter, now
+            results.put((lane_id, voter))
+    finally:
+        scanner.stop()
+        results.put((lane_id, {"stats": scanner.stats()}))
+
+
+def run_host(lanes, ledger_path, key_path=KEY_PATH, durability=GROUP, detection=DETECTION,
+             sync_url=SYNC_URL, sync_key_path=SYNC_KEY_PATH):
+    """Drive several camera lanes of one polling station from one process.
+
+    `lanes` is a list of (lane_id, camera_index). Each lane's capture and
+    decode runs in its own process; votes come back over one queue and are
+    recorded by a single ledger writer, chain and voter index, so a voter
+    is refused on every lane once they have voted on any of them.
+    """
+    key = load_key(key_path)
+    recorder = BoothRecorder(
+        ledger_path, durability=durability, sync_url=sync_url, sync_key_path=sync_key_path
+    )
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    stop = ctx.Event()
+    workers = [
+        ctx.Process(
+            target=lane_worker,
+            args=(lane_id, camera_index, key, detection, results, stop),
+            daemon=True
+        )
+        for lane_id, camera_index in lanes
+    ]
+    for w in workers:
+        w.start()
+
+    print(f"OBVV Polling Station Started with {len(lanes)} lanes (Ctrl+C to stop)")
+    print("Resuming at block", recorder.chain.get_latest_block().index)
+
+    # Votes are confirmed only once their group commit is durable.
+    unconfirmed = deque()
+    try:
+        while any(w.is_alive() for w in workers):
+            try:
+                lane_id, voter = results.get(timeout=0.01)
+            except queue.Empty:
+                voter = None
+
+            if voter is not None and "stats" in voter:
+                print(f"[lane {lane_id}] Scanner stats:", voter["stats"])
+            elif voter is not None:
+                block, seq = recorder.queue_vote(voter["voter_id"])
+                if block is None:
+                    print(f"[lane {lane_id}] 🚫 Already voted at this station - vote refused")
+                else:
+                    unconfirmed.append((seq, lane_id, block))
+
+            while unconfirmed and recorder.ledger.wait_durable(unconfirmed[0][0], timeout=0):
+                _, lane_id, block = unconfirmed.popleft()
+                print_recorded(block, lane=lane_id)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for w in workers:
+            w.join(timeout=2)
+        recorder.close()
+        for _, lane_id, block in unconfirmed:
+            print_recorded(block, lane=lane_id)
+
+    print("\nLedger stored in SQL database:", ledger_path)
+
+
+# ===================== HEADLESS BATCH MODE =====================
+
+def percentiles_ms(samples, points=(50, 95, 99)):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        f"p{p}": round(1000 * ordered[min(len(ordered) * p // 100, len(ordered) - 1)], 3)
+        for p in points
+    }
+
+
+def run_batch(source, ledger_path, key_path=KEY_PATH, durability=DURABILITY,
+              detection=DETECTION, hold=1):
+    """Push frames from `source` through decode -> decrypt -> hash -> block -> ledger.
+
+    No camera, window or keyboard is used. Returns (and prints) votes/sec,
+    per-stage latency percentiles and failure counts.
+    """
+    cipher = Fernet(load_key(key_path))
+    # Never started: only its decrypt path and cache are used.
+    scanner = QRScanner(cipher, detection=detection, show_preview=False)
+    detector = make_detector(detection)
+    recorder = BoothRecorder(ledger_path, durability=durability)
+
+    stages = {"decode": [], "decrypt": [], "record": []}
+    counts = {"frames": 0, "no_qr": 0, "invalid_qr": 0, "repeat_frames": 0,
+              "refused": 0, "recorded": 0}
+    last_voter_id = None
+    last_seq = 0
+
+    start = time.perf_counter()
+    for frame in open_source(source, cipher=cipher, hold=hold):
+        counts["frames"] += 1
+
+        t0 = time.perf_counter()
+        decoded_objects = detector.detect(frame)
+        stages["decode"].append(time.perf_counter() - t0)
+        if not decoded_objects:
+            counts["no_qr"] += 1
+            continue
+
+        for obj in decoded_objects:
+            t0 = time.perf_counter()
+            voter = scanner.validate(obj.data)
+            stages["decrypt"].append(time.perf_counter() - t0)
+            if voter is None:
+                counts["invalid_qr"] += 1
+                continue
+
+            t0 = time.perf_counter()
+            block, seq = recorder.queue_vote(voter["voter_id"])
+            stages["record"].append(time.perf_counter() - t0)
+            if block is not None:
+                counts["recorded"] += 1
+                last_seq = seq
+            elif voter["voter_id"] == last_voter_id:
+                counts["repeat_frames"] += 1
+            else:
+                counts["refused"] += 1
+            last_voter_id = voter["voter_id"]
+
+    recorder.ledger.wait_durable(last_seq)
+    elapsed = time.perf_counter() - start
+    recorder.close()
+
+    report = {
+        "source": source,
+        "ledger": ledger_path,
+        "detection": detection,
+        "durability": durability,
+        "seconds": round(elapsed, 3),
+        "frames_per_sec": round(counts["frames"] / elapsed, 1) if elapsed else None,
+        "votes_per_sec": round(counts["recorded"] / elapsed, 1) if elapsed else None,
+        **counts,
+        "latency_ms": {name: percentiles_ms(samples) for name, samples in stages.items()},
+    }
+    for key, value in report.items():
+        print(f"{key:15}: {value}")
+    return report
+
+
+def parse_lane(value):
+    lane_id, _, camera_index = value.partition(":")
+    return int(lane_id), int(camera_index or lane_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OBVV polling booth")
+    parser.add_argument("--booth", type=int, default=1, help="booth id")
+    parser.add_argument("--camera", type=int, default=0, help="camera index")
+    parser.add_argument("--ledger", help="ledger path (default booth_ledger_<booth>.db)")
+    parser.add_argument("--key", default=KEY_PATH)
+    parser.add_argument("--durability", choices=[STRICT, GROUP])
+    parser.add_argument("--detection", choices=[FULL_FRAME, ADAPTIVE], default=DETECTION)
+    parser.add_argument("--decoder-workers", type=int, default=DECODER_WORKERS)
+    parser.add_argument("--verify", action="store_true", help="re-walk the ledger on startup")
+    parser.add_argument(
+        "--lanes", nargs="+", type=parse_lane, metavar="LANE:CAMERA",
+        help="host mode: run these lanes concurrently into one ledger"
+    )
+    parser.add_argument(
+        "--source",
+        help="headless batch mode: image folder, video file or synthetic:N"
+    )
+    parser.add_argument("--hold", type=int, default=1, help="batch mode: frames per card")
+    parser.add_argument("--sync", default=SYNC_URL, metavar="URL",
+                        help="push committed votes to this central server")
+    parser.add_argument("--sync-key", default=SYNC_KEY_PATH,
+                        help="key file pushes to the central server are signed with")
+    args = parser.parse_args(argv)
+
+    if args.source:
+        # Never default to the real booth ledger, which central verification reads.
+        run_batch(
+            args.source, args.ledger or f"batch_ledger_{args.booth}.db", key_path=args.key,
+            durability=args.durability or DURABILITY, detection=args.detection, hold=args.hold
+        )
+        return
+
+    ledger_path = args.ledger or ledger_path_for(args.booth)
+    if args.lanes:
+        run_host(
+            args.lanes, ledger_path, key_path=args.key,
+            durability=args.durability or GROUP, detection=args.detection, sync_url=args.sync,
+            sync_key_path=args.sync_key
+        )
+    else:
+        run_booth(
+            args.booth, camera_index=args.camera, ledger_path=ledger_path, key_path=args.key,
+            durability=args.durability or DURABILITY, detection=args.detection,
+            decoder_workers=args.decoder_workers, verify_on_start=args.verify,
+            sync_url=args.sync, sync_key_path=args.sync_key
+        )
+
+
+if __name__ == "__main__":
+    main()
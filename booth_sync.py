@@ -0,0 +1,176 @@
+import http.client
+import json
+import os
+import random
+import sqlite3
+import threading
+from urllib.parse import quote, urlsplit
+
+from ledger_delta import DELTA_QUERY, SIGNATURE_HEADER, encode_delta, sign_delta
+
+
+# BOOTH -> CENTRAL SYNC
+#
+# An optional SyncAgent thread pushes committed ledger rows to the central
+# server's /ingest endpoint. It reads the ledger through its own read-only
+# connection (WAL readers never block the LedgerWriter), so voting never
+# waits on the network: while the central server is slow or unreachable
+# the backlog simply stays in the ledger and is sent later.
+#
+# Batches are ledger deltas (see ledger_delta.py): binary hashes and
+# compressed integer columns, ~67 bytes per row. They go out one at a time
+# over one persistent HTTP/1.1 connection. A batch is identified by the
+# booth and its id range, and the central server skips rows it already
+# has, so any batch may be resent. The agent resumes from the watermark the
+# central server reports, so it keeps no state of its own. Every push is
+# signed with the booth's key (the central server has a copy); a push the
+# central server finds contradicting rows it already has for this booth
+# is an error, retried with backoff, never skipped.
+
+SYNC_BATCH_ROWS = 5000
+SYNC_INTERVAL_SECONDS = 1.0
+SYNC_TIMEOUT_SECONDS = 30
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+
+class SyncAgent:
+    def __init__(self, ledger_path, central_url, key, booth_db=None, batch_rows=SYNC_BATCH_ROWS,
+                 interval=SYNC_INTERVAL_SECONDS, timeout=SYNC_TIMEOUT_SECONDS):
+        self.ledger_path = ledger_path
+        self.key = key
+        self.booth_db = booth_db or os.path.basename(ledger_path)
+        self.batch_rows = batch_rows
+        self.interval = interval
+        self.timeout = timeout
+
+        url = urlsplit(central_url)
+        self._connection_class = (
+            http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        )
+        self._netloc = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self._http = None
+
+        self.acked_id = None
+        self.batches = 0
+        self.rows_sent = 0
+        self.bytes_sent = 0
+        self.retries = 0
+        self.busy = 0
+        self.connections = 0
+        self.last_error = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def stats(self):
+        return {
+            "running": self._thread is not None,
+            "acked_id": self.acked_id,
+            "batches": self.batches,
+            "rows_sent": self.rows_sent,
+            "bytes_sent": self.bytes_sent,
+            "retries": self.retries,
+            "busy": self.busy,
+            "connections": self.connections,
+            "last_error": self.last_error,
+        }
+
+    def _request(self, method, path, body=None, headers=None):
+        """(status, headers, JSON reply) over the persistent connection."""
+        if self._http is None:
+            self._http = self._connection_class(self._netloc, timeout=self.timeout)
+            self.connections += 1
+        try:
+            self._http.request(method, self._prefix + path, body=body, headers=headers or {})
+            response = self._http.getresponse()
+            reply = response.read()
+        except (OSError, http.client.HTTPException):
+            # Also a keep-alive connection the server closed: reconnect next time.
+            self._http.close()
+            self._http = None
+            raise
+        return response.status, response.headers, json.loads(reply) if reply else {}
+
+    def _run(self):
+        ledger = None
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    if ledger is None:
+                        ledger = sqlite3.connect(f"file:{self.ledger_path}?mode=ro", uri=True)
+                    wait = self._push_once(ledger)
+                    failures = 0
+                except (OSError, sqlite3.Error, http.client.HTTPException, ValueError) as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self.retries += 1
+                    failures += 1
+                    # Exponential backoff with jitter, so a fleet does not retry in step.
+                    wait = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (failures - 1))
+                    wait *= random.uniform(0.5, 1.0)
+                if wait:
+                    self._stop.wait(wait)
+        finally:
+            if ledger is not None:
+                ledger.close()
+            if self._http is not None:
+                self._http.close()
+
+    def _push_once(self, ledger):
+        """Push the next batch; returns how long to wait before the next one."""
+        if self.acked_id is None:
+            status, _, reply = self._request(
+                "GET", f"/ingest/watermark?booth_db={quote(self.booth_db)}"
+            )
+            if status != 200:
+                raise ValueError(f"watermark request failed with HTTP {status}")
+            self.acked_id = reply["last_id"]
+
+        try:
+            rows = ledger.execute(DELTA_QUERY, (self.acked_id,)).fetchmany(self.batch_rows)
+        except sqlite3.OperationalError:
+            # No ledger table yet: nothing has been recorded at this booth.
+            rows = []
+        if not rows:
+            return self.interval
+
+        body = encode_delta(self.booth_db, self.acked_id, rows)
+        status, headers, reply = self._request("POST", "/ingest", body=body, headers={
+            "Content-Type": "application/octet-stream",
+            "X-Batch-Id": f"{self.booth_db}:{self.acked_id}-{rows[-1][0]}",
+            SIGNATURE_HEADER: sign_delta(self.key, body),
+        })
+        if status == 503:
+            self.busy += 1
+            return float(headers.get("Retry-After", 1))
+        if status not in (200, 409):
+            raise ValueError(f"push rejected with HTTP {status}: {reply.get('error')}")
+        if reply.get("status") == "conflict":
+            raise ValueError(
+                f"central has other rows for {self.booth_db} at ids {reply['conflicting_ids']}"
+            )
+
+        if status == 200:
+            self.batches += 1
+            self.rows_sent += len(rows)
+            self.bytes_sent += len(body)
+        # 409: the central server is behind this batch; resend from its watermark.
+        self.acked_id = reply["last_id"]
+        # A full batch means more rows are waiting: push again right away.
+        return 0 if len(rows) == self.batch_rows else self.interval
@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+# VERIFICATION RESULT CACHE
+#
+# One cached result per key (the verification engine), valid for as long
+# as the booth ledger fingerprint it was computed for. A request that
+# arrives while the same key is being computed waits for that computation
+# instead of starting another one.
+
+class ResultCache:
+    def __init__(self):
+        self.hits = 0
+        self.coalesced = 0
+        self.computations = 0
+        self.compute_seconds = 0.0
+        self.last_compute_seconds = None
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, fingerprint, compute):
+        """Return (value, source); source is "cache", "coalesced" or "computed"."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                return entry[1], "cache"
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result(), "coalesced"
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            # Stored under the fingerprint seen before computing: if the
+            # ledgers changed meanwhile, the next request recomputes.
+            self._entries[key] = (fingerprint, value)
+            del self._in_flight[key]
+            self.computations += 1
+            self.compute_seconds += elapsed
+            self.last_compute_seconds = elapsed
+        future.set_result(value)
+        return value, "computed"
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.coalesced + self.computations
+            return {
+                "requests": requests,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "computations": self.computations,
+                "hit_rate": (self.hits + self.coalesced) / requests if requests else None,
+                "last_compute_seconds": self.last_compute_seconds,
+                "mean_compute_seconds": (
+                    self.compute_seconds / self.computations if self.computations else None
+                ),
+            }
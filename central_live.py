@@ -0,0 +1,125 @@
+import json
+import queue
+import threading
+import time
+
+
+# LIVE VERIFICATION UPDATES
+#
+# One background LiveVerifier polls a cheap fingerprint of the booth
+# ledgers and runs the incremental verification only when it changes.
+# Its results are pushed to every dashboard over Server-Sent Events by a
+# Broadcaster, so any number of viewers share a single computation. Each
+# message is serialised once; a viewer whose queue fills up is dropped and
+# its EventSource reconnects to a fresh snapshot.
+
+LIVE_POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15.0
+SUBSCRIBER_QUEUE = 64
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    def __init__(self, depth=SUBSCRIBER_QUEUE):
+        self.queue = queue.Queue(depth)
+        self.closed = False
+
+    def messages(self, heartbeat=HEARTBEAT_SECONDS):
+        """Yield SSE messages; a comment line every `heartbeat` idle seconds."""
+        while not self.closed:
+            try:
+                yield self.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                # Keeps proxies from timing out and detects gone clients.
+                yield ": keepalive\n\n"
+
+
+class Broadcaster:
+    def __init__(self, depth=SUBSCRIBER_QUEUE):
+        self.depth = depth
+        self.dropped = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = Subscriber(self.depth)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.closed = True
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                self.dropped += 1
+                self.unsubscribe(subscriber)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class LiveVerifier:
+    """Run `verify()` whenever `fingerprint()` changes, on one thread."""
+
+    def __init__(self, fingerprint, verify, poll_interval=LIVE_POLL_SECONDS):
+        self.fingerprint = fingerprint
+        self.verify = verify
+        self.poll_interval = poll_interval
+        self.polls = 0
+        self.computations = 0
+        self.last_compute_seconds = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def stats(self):
+        return {
+            "running": self._thread is not None,
+            "polls": self.polls,
+            "computations": self.computations,
+            "last_compute_seconds": self.last_compute_seconds,
+        }
+
+    def _run(self):
+        seen = None
+        while not self._stop.is_set():
+            self.polls += 1
+            try:
+                current = self.fingerprint()
+                if current != seen:
+                    start = time.perf_counter()
+                    self.verify()
+                    self.last_compute_seconds = time.perf_counter() - start
+                    self.computations += 1
+                    seen = current
+            except Exception as e:
+                # A ledger mid-copy or locked: try again on the next poll.
+                print(f"Live verification failed: {e}")
+            self._stop.wait(self.poll_interval)
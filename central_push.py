@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# PUSHED BATCH WRITER
+#
+# Booths push batches of ledger rows concurrently; request threads only
+# decode and check them and hand them to one BatchWriter thread, which
+# owns all writes to the central index. Whatever has queued up while the
+# previous transaction ran is applied together in the next one, so many
+# booths share each commit. The queue is bounded: when it is full,
+# submit() raises queue.Full and the booth is told to come back later
+# instead of piling up requests (and memory) on the central server.
+
+INGEST_QUEUE = 256
+MAX_GROUP_BATCHES = 64
+
+
+class BatchWriter:
+    """Apply submitted items with `apply(items) -> results`, on one thread."""
+
+    def __init__(self, apply, queue_size=INGEST_QUEUE, max_group=MAX_GROUP_BATCHES):
+        self.apply = apply
+        self.max_group = max_group
+        self.batches = 0
+        self.transactions = 0
+        self.rejected = 0
+        self.last_apply_seconds = None
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        """Queue `item`; returns a Future of its result. Raises queue.Full."""
+        self.start()
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self.rejected += 1
+            raise
+        return future
+
+    def stats(self):
+        return {
+            "running": self._thread is not None,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "transactions": self.transactions,
+            "rejected": self.rejected,
+            "batches_per_transaction": self.batches / self.transactions if self.transactions else None,
+            "last_apply_seconds": self.last_apply_seconds,
+        }
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            while len(group) < self.max_group:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            start = time.perf_counter()
+            try:
+                results = self.apply([item for item, _ in group])
+            except Exception as e:
+                for _, future in group:
+                    future.set_exception(e)
+                continue
+            self.last_apply_seconds = time.perf_counter() - start
+            self.batches += len(group)
+            self.transactions += 1
+            for (_, future), result in zip(group, results):
+                future.set_result(result)
@@ -0,0 +1,122 @@
+import heapq
+import multiprocessing
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ledger_stream import READ_CHUNK
+
+
+# SHARDED DUPLICATE ENGINE
+#
+# The voter_hash space is cut into contiguous prefix ranges, one per
+# shard. A worker reads only its range from every booth ledger (the range
+# test runs inside SQLite), finds duplicates for it, and returns plain
+# lists; the coordinator adds up the counts and merges the duplicate
+# lists. Shard inputs and outputs are plain data, so the executor can be
+# swapped for one that runs shards on other machines. The result is
+# identical to detect_duplicates_and_counts.
+
+SHARD_WORKERS = 4
+
+# Spawn pools by worker count, started on first use and kept for later
+# requests: starting a pool costs more than a small verification run.
+shard_pools = {}
+pools_lock = threading.Lock()
+
+
+def shard_ranges(shards):
+    """[low, high) voter_hash ranges covering every string; high None = open."""
+    bounds = [""] + [format(i * 256 // shards, "02x") for i in range(1, shards)] + [None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def scan_shard(booths, low, high, chunk_size=READ_CHUNK):
+    """Duplicates among votes with low <= voter_hash < high.
+
+    Returns (total_votes, valid_votes, duplicates); each duplicate is
+    (first_key, key, duplicate_dict) where keys are (booth position, id)
+    of the hash's first vote and of the duplicate, already in order.
+    """
+    condition = "voter_hash >= ?" if high is None else "voter_hash >= ? AND voter_hash < ?"
+    params = (low,) if high is None else (low, high)
+
+    first_seen = {}
+    duplicates = []
+    total_votes = 0
+    for position, (booth_name, path) in enumerate(booths):
+        conn = sqlite3.connect(path)
+        try:
+            cursor = conn.execute(f"""
+                SELECT id, vote_count, voter_hash, timestamp
+                FROM booth_ledger WHERE {condition}
+                ORDER BY id
+            """, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total_votes += len(rows)
+                for ledger_id, vote_count, voter_hash, timestamp in rows:
+                    key = (position, ledger_id)
+                    first_key = first_seen.setdefault(voter_hash, key)
+                    if first_key is not key:
+                        duplicates.append((first_key, key, {
+                            "voter_hash": voter_hash,
+                            "booth": booth_name,
+                            "vote_count": vote_count,
+                            "timestamp": timestamp
+                        }))
+        finally:
+            conn.close()
+
+    # Appended in key order; the report groups them by first vote.
+    duplicates.sort(key=lambda item: (item[0], item[1]))
+    return total_votes, len(first_seen), duplicates
+
+
+def get_shard_pool(workers):
+    with pools_lock:
+        pool = shard_pools.get(workers)
+        if pool is None:
+            pool = shard_pools[workers] = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def discard_shard_pool(workers, pool):
+    with pools_lock:
+        if shard_pools.get(workers) is pool:
+            del shard_pools[workers]
+    pool.shutdown(wait=False)
+
+
+def find_duplicates_sharded(booths, workers=SHARD_WORKERS, shards=None, executor=None):
+    """`booths` is a list of (booth_name, ledger_path) in verification order.
+
+    `shards` defaults to `workers`; pass an `executor` to run shards
+    elsewhere, otherwise this process's spawn pool for `workers` is used.
+    """
+    ranges = shard_ranges(shards or workers)
+    pool = executor or get_shard_pool(workers)
+    try:
+        futures = [pool.submit(scan_shard, booths, low, high) for low, high in ranges]
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died; the next request starts a fresh pool.
+        if executor is None:
+            discard_shard_pool(workers, pool)
+        raise
+
+    total_votes = sum(total for total, _, _ in results)
+    valid_votes = sum(valid for _, valid, _ in results)
+    merged = heapq.merge(*(duplicates for _, _, duplicates in results),
+                         key=lambda item: (item[0], item[1]))
+    return {
+        "total_votes": total_votes,
+        "valid_votes": valid_votes,
+        "duplicate_votes": total_votes - valid_votes,
+        "duplicates": [duplicate for _, _, duplicate in merged]
+    }
@@ -0,0 +1,117 @@
+import sqlite3
+
+
+# SQL DUPLICATE ENGINE
+#
+# Booth ledgers are ATTACHed to one connection and aggregated with
+# UNION ALL / GROUP BY voter_hash inside SQLite; Python only sees the
+# duplicate rows. Returns exactly what detect_duplicates_and_counts does:
+# the first vote for a hash (in booth order, then ledger id order) is
+# valid and every later one is listed as a duplicate in that same order.
+
+# SQLite's default SQLITE_MAX_ATTACHED.
+ATTACH_BATCH = 10
+
+# Page cache for the aggregate database, in KiB.
+CACHE_KIB = 512 * 1024
+
+# Global ordering key for a vote: booth position, then ledger row id.
+KEY_SHIFT = 1 << 40
+
+
+def find_duplicates_sql(booths, attach_batch=ATTACH_BATCH):
+    """`booths` is a list of (booth_name, ledger_path) in verification order."""
+    # "" is a private temporary database that spills to disk when large.
+    conn = sqlite3.connect("")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    try:
+        conn.execute("""
+            CREATE TABLE vote_agg (
+                voter_hash TEXT PRIMARY KEY,
+                votes INTEGER NOT NULL,
+                first_key INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+        for batch in batches(booths, attach_batch):
+            union = attach_batch_union(conn, batch, "voter_hash, {key} AS vote_key")
+            conn.execute(f"""
+                INSERT INTO vote_agg (voter_hash, votes, first_key)
+                SELECT voter_hash, COUNT(*), MIN(vote_key)
+                FROM ({union})
+                WHERE true
+                GROUP BY voter_hash
+                ON CONFLICT (voter_hash) DO UPDATE SET
+                    votes = votes + excluded.votes,
+                    first_key = MIN(first_key, excluded.first_key)
+            """)
+            conn.commit()
+            detach_all(conn, batch)
+
+        total_votes, valid_votes = conn.execute("""
+            SELECT COALESCE(SUM(votes), 0), COUNT(*) FROM vote_agg
+        """).fetchone()
+
+        conn.execute("""
+            CREATE TABLE dup_hashes AS
+            SELECT voter_hash, first_key FROM vote_agg WHERE votes > 1
+        """)
+        conn.execute("CREATE UNIQUE INDEX idx_dup_hashes ON dup_hashes (voter_hash)")
+
+        rows = []
+        for batch in batches(booths, attach_batch):
+            union = attach_batch_union(
+                conn, batch, "{key} AS vote_key, voter_hash, vote_count, timestamp"
+            )
+            rows.extend(conn.execute(f"""
+                SELECT d.first_key, v.vote_key, v.voter_hash, v.vote_count, v.timestamp
+                FROM ({union}) v
+                JOIN dup_hashes d ON d.voter_hash = v.voter_hash
+                WHERE v.vote_key != d.first_key
+            """))
+            detach_all(conn, batch)
+    finally:
+        conn.close()
+
+    booth_names = [name for name, _ in booths]
+    rows.sort()
+    duplicates = [
+        {
+            "voter_hash": voter_hash,
+            "booth": booth_names[vote_key // KEY_SHIFT],
+            "vote_count": vote_count,
+            "timestamp": timestamp
+        }
+        for _, vote_key, voter_hash, vote_count, timestamp in rows
+    ]
+
+    return {
+        "total_votes": total_votes,
+        "valid_votes": valid_votes,
+        "duplicate_votes": total_votes - valid_votes,
+        "duplicates": duplicates
+    }
+
+
+def batches(booths, size):
+    """Yield (booth_position, path) lists of at most `size` booths."""
+    numbered = [(position, path) for position, (_, path) in enumerate(booths)]
+    for start in range(0, len(numbered), size):
+        yield numbered[start:start + size]
+
+
+def attach_batch_union(conn, batch, columns):
+    selects = []
+    for slot, (position, path) in enumerate(batch):
+        conn.execute(f"ATTACH DATABASE ? AS booth_{slot}", (path,))
+        key = f"{position} * {KEY_SHIFT} + id"
+        selects.append(
+            f"SELECT {columns.format(key=key)} FROM booth_{slot}.booth_ledger"
+        )
+    return " UNION ALL ".join(selects)
+
+
+def detach_all(conn, batch):
+    for slot in range(len(batch)):
+        conn.execute(f"DETACH DATABASE booth_{slot}")
@@ -1,13 +1,81 @@
+import hmac
+import io
+import json
 import os
+import queue
 import sqlite3
-from flask import Flask, jsonify, render_template
+import threading
+from concurrent import futures
+from flask import Flask, Response, jsonify, render_template, request
 from collections import defaultdict
+from blockchain import verify_chain
+from central_cache import ResultCache
+from central_live import Broadcaster, LiveVerifier, format_sse
+from central_merge import find_duplicates_merge
+from central_push import BatchWriter
+from central_shard import SHARD_WORKERS, find_duplicates_sharded
+from central_sql import find_duplicates_sql
+from ledger_delta import SIGNATURE_HEADER, iter_delta_chunks, read_delta_header, read_push_key, sign_delta
+from ledger_merkle import audit_merkle, diff_ledgers, load_merkle_state, merkle_root, row_hash
+from ledger_stream import READ_WORKERS, iter_ledger_chunks
+
+try:
+    from central_compact import find_duplicates_compact
+except ImportError:
+    # NumPy not installed: the "compact" engine is unavailable.
+    find_duplicates_compact = None
 
 app = Flask(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CENTRAL_DB = os.path.join(BASE_DIR, "central_duplicates.db")
 
+# Where the booths' original ledgers can be read (e.g. a mounted share);
+# /ledger_integrity compares each local copy against it by Merkle tree.
+ORIGINAL_LEDGER_DIR = None
+
+# Booth ledgers are read by READ_WORKERS threads (or processes).
+READ_USE_PROCESSES = False
+
+# Per-booth rows and SQLite read time of the last ledger scan.
+last_read_timings = {}
+
+# /duplicates page size: default and the most a client may ask for.
+DUPLICATE_PAGE_SIZE = 500
+MAX_DUPLICATE_PAGE_SIZE = 5000
+
+# Newly found duplicates sent with a live update; the rest are paged.
+LIVE_PUSHED_DUPLICATES = 200
+
+# One incremental ingest at a time, whether from a request or the live
+# verifier; each delta is broadcast to every /events viewer.
+ingest_lock = threading.Lock()
+live_updates = Broadcaster()
+
+# Booth sync agents (booth_sync.py): largest accepted push, how long a
+# push may wait for the writer (below the agents' request timeout), and
+# when to retry if the writer is saturated.
+MAX_PUSH_BYTES = 16 * 1024 * 1024
+PUSH_WAIT_SECONDS = 10
+PUSH_RETRY_AFTER_SECONDS = 1
+
+# Push keys, one <booth_db>.key file per booth (e.g. booth_ledger_1.db.key)
+# holding the key of that booth's --sync-key file. /ingest only indexes
+# rows for a booth_db whose key signed the push.
+BOOTH_KEYS_DIR = os.path.join(BASE_DIR, "booth_keys")
+
+# Ids listed when a pushed batch contradicts rows already indexed.
+MAX_REPORTED_CONFLICTS = 20
+
+# Bumped by every delta import that added rows; part of the fingerprint,
+# since imported rows change the index without touching a booth ledger.
+delta_imports = 0
+
+# Last /ledger_audit result per booth copy: (file stats it was taken on,
+# whether the stored Merkle tree matched the rows). /ledger_integrity
+# walks the stored trees and reports the audit while the files are unchanged.
+tree_audits = {}
+
 
 def get_central_db():
     return sqlite3.connect(CENTRAL_DB)
@@ -18,12 +86,81 @@ def init_central_db():
     db.execute("""
         CREATE TABLE IF NOT EXISTS duplicate_votes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            engine TEXT NOT NULL,
             voter_hash TEXT,
             booth TEXT,
             vote_count INTEGER,
             timestamp TEXT
         )
     """)
+    columns = {row[1] for row in db.execute("PRAGMA table_info(duplicate_votes)")}
+    if "engine" not in columns:
+        # Rows stored before engines were kept apart mix the results of
+        # every engine and cannot be attributed; drop them and let the
+        # incremental engine rebuild its index on its next run.
+        db.execute("DROP INDEX IF EXISTS idx_duplicate_votes_unique")
+        db.execute("DELETE FROM duplicate_votes")
+        db.execute("ALTER TABLE duplicate_votes ADD COLUMN engine TEXT NOT NULL DEFAULT ''")
+        db.execute("DROP TABLE IF EXISTS verification_totals")
+    # Each engine stores its own result (engines may list a different
+    # vote of a pair), and re-running one must not store a duplicate twice.
+    db.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_duplicate_votes_engine_unique
+        ON duplicate_votes (engine, voter_hash, booth, vote_count)
+    """)
+    # Keyset pages of one engine's rows: (engine, rowid) order.
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_duplicate_votes_engine
+        ON duplicate_votes (engine)
+    """)
+    # Lookups of one voter's duplicates across engines.
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_duplicates_voter
+        ON duplicate_votes (voter_hash)
+    """)
+
+    # Incremental verification state: how far each booth ledger has been
+    # ingested, the first vote seen for every voter hash, and running totals.
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS booth_watermarks (
+            booth_db TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS voter_index (
+            voter_hash TEXT PRIMARY KEY,
+            booth TEXT NOT NULL,
+            vote_count INTEGER NOT NULL,
+            timestamp TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS verification_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_votes INTEGER NOT NULL,
+            valid_votes INTEGER NOT NULL,
+            duplicate_votes INTEGER NOT NULL
+        )
+    """)
+    # Every row indexed from a pushed or imported delta, so a row resent
+    # under the same id can be told apart from a different one.
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS pushed_rows (
+            booth_db TEXT NOT NULL,
+            ledger_id INTEGER NOT NULL,
+            row_hash BLOB NOT NULL,
+            block_hash TEXT,
+            PRIMARY KEY (booth_db, ledger_id)
+        ) WITHOUT ROWID
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS chain_checkpoints (
+            booth_db TEXT PRIMARY KEY,
+            ledger_id INTEGER NOT NULL,
+            block_hash TEXT
+        )
+    """)
     db.commit()
     db.close()
 
@@ -35,27 +172,62 @@ def detect_booth_databases():
     ]
 
 
-def load_votes_from_booth(db_file):
-    path = os.path.join(BASE_DIR, db_file)
-    conn = sqlite3.connect(path)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT vote_count, voter_hash, timestamp
-        FROM booth_ledger
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+def booth_display_name(booth_db):
+    return booth_db.replace(".db", "").replace("_", "-").title()
 
 
-def save_duplicate(voter_hash, booth, vote_count, timestamp):
-    db = get_central_db()
-    db.execute("""
-        INSERT INTO duplicate_votes (voter_hash, booth, vote_count, timestamp)
-        VALUES (?, ?, ?, ?)
-    """, (voter_hash, booth, vote_count, timestamp))
-    db.commit()
-    db.close()
+def booth_sources():
+    """(booth_name, ledger_path) for every booth, in verification order."""
+    return [
+        (booth_display_name(booth_db), os.path.join(BASE_DIR, booth_db))
+        for booth_db in detect_booth_databases()
+    ]
+
+
+def stream_booth_votes(booth_dbs, after_ids=None):
+    """Yield (booth_db, rows) chunks for `booth_dbs`, in order.
+
+    Ledgers are read concurrently (READ_WORKERS, READ_USE_PROCESSES) and
+    streamed in fetchmany chunks; per-booth read times land in
+    last_read_timings.
+    """
+    after_ids = after_ids or {}
+    sources = [
+        (os.path.join(BASE_DIR, booth_db), after_ids.get(booth_db, 0))
+        for booth_db in booth_dbs
+    ]
+    timings = {}
+    chunks = iter_ledger_chunks(
+        sources, timings=timings, workers=READ_WORKERS, use_processes=READ_USE_PROCESSES
+    )
+    for position, rows in chunks:
+        yield booth_dbs[position], rows
+
+    last_read_timings.clear()
+    last_read_timings.update({
+        booth_display_name(booth_dbs[position]): timing
+        for position, timing in sorted(timings.items())
+    })
+
+
+def save_duplicates(engine, duplicates, db=None, replace=False):
+    """Bulk-insert `engine`'s duplicate dicts; ones already stored are skipped.
+
+    With `replace` the engine's earlier rows are dropped first: a full
+    engine's result is the complete list.
+    """
+    own_db = db is None
+    if own_db:
+        db = get_central_db()
+    if replace:
+        db.execute("DELETE FROM duplicate_votes WHERE engine = ?", (engine,))
+    db.executemany("""
+        INSERT OR IGNORE INTO duplicate_votes (engine, voter_hash, booth, vote_count, timestamp)
+        VALUES (:engine, :voter_hash, :booth, :vote_count, :timestamp)
+    """, ({**duplicate, "engine": engine} for duplicate in duplicates))
+    if own_db:
+        db.commit()
+        db.close()
 
 
 def detect_duplicates_and_counts():
@@ -64,11 +236,10 @@ def detect_duplicates_and_counts():
 
     total_votes = 0
 
-    for booth_db in booth_dbs:
-        booth_name = booth_db.replace(".db", "").replace("_", "-").title()
-        votes = load_votes_from_booth(booth_db)
+    for booth_db, votes in stream_booth_votes(booth_dbs):
+        booth_name = booth_display_name(booth_db)
 
-        for vote_count, voter_hash, timestamp in votes:
+        for _, vote_count, voter_hash, timestamp in votes:
             total_votes += 1
             vote_map[voter_hash].append({
                 "booth": booth_name,
@@ -83,12 +254,6 @@ def detect_duplicates_and_counts():
         if len(entries) > 1:
             duplicate_count += len(entries) - 1
             for e in entries[1:]:
-                save_duplicate(
-                    voter_hash,
-                    e["booth"],
-                    e["vote_count"],
-                    e["timestamp"]
-                )
                 duplicates.append({
                     "voter_hash": voter_hash,
                     "booth": e["booth"],
@@ -96,6 +261,7 @@ def detect_duplicates_and_counts():
                     "timestamp": e["timestamp"]
                 })
 
+    save_duplicates("python", duplicates, replace=True)
     valid_votes = len(vote_map)
 
     return {
@@ -106,10 +272,533 @@ def detect_duplicates_and_counts():
     }
 
 
+def detect_duplicates_sql():
+    """Same result as detect_duplicates_and_counts, computed inside SQLite."""
+    result = find_duplicates_sql(booth_sources())
+    save_duplicates("sql", result["duplicates"], replace=True)
+    return result
+
+
+def detect_duplicates_compact():
+    """Same result as detect_duplicates_and_counts from ~38 bytes per vote."""
+    result = find_duplicates_compact(booth_sources(), workers=READ_WORKERS)
+    save_duplicates("compact", result["duplicates"], replace=True)
+    return result
+
+
+def detect_duplicates_sharded():
+    """Same result as detect_duplicates_and_counts, split by voter_hash prefix
+    across SHARD_WORKERS processes."""
+    result = find_duplicates_sharded(booth_sources(), workers=SHARD_WORKERS)
+    save_duplicates("sharded", result["duplicates"], replace=True)
+    return result
+
+
+def detect_duplicates_merge():
+    """Earliest vote by timestamp is valid; bounded-memory k-way merge."""
+    result = find_duplicates_merge(booth_sources())
+    save_duplicates("merge", result["duplicates"], replace=True)
+    return result
+
+
+def iter_duplicate_rows(db, engine, after_id=0, limit=-1):
+    """(id, voter_hash, booth, vote_count, timestamp) rows of `engine` in id order.
+
+    Keyset pagination on (engine, id): each page is an index range scan
+    no matter how deep the cursor is.
+    """
+    return db.execute("""
+        SELECT id, voter_hash, booth, vote_count, timestamp
+        FROM duplicate_votes WHERE engine = ? AND id > ?
+        ORDER BY id LIMIT ?
+    """, (engine, after_id, limit))
+
+
+def duplicate_page(engine, after_id=0, limit=DUPLICATE_PAGE_SIZE):
+    """One page of `engine`'s stored duplicates plus the cursor for the next one."""
+    db = get_central_db()
+    rows = iter_duplicate_rows(db, engine, after_id, limit).fetchall()
+    db.close()
+
+    duplicates = [
+        {
+            "id": row_id,
+            "voter_hash": voter_hash,
+            "booth": booth,
+            "vote_count": vote_count,
+            "timestamp": timestamp
+        }
+        for row_id, voter_hash, booth, vote_count, timestamp in rows
+    ]
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    return {"duplicates": duplicates, "next_cursor": next_cursor}
+
+
+def stream_duplicates_ndjson(engine, after_id=0):
+    """Every duplicate `engine` stored after `after_id`, one JSON object per line."""
+    db = get_central_db()
+    try:
+        cursor = iter_duplicate_rows(db, engine, after_id)
+        while True:
+            rows = cursor.fetchmany(DUPLICATE_PAGE_SIZE)
+            if not rows:
+                return
+            yield "".join(
+                json.dumps({
+                    "id": row_id,
+                    "voter_hash": voter_hash,
+                    "booth": booth,
+                    "vote_count": vote_count,
+                    "timestamp": timestamp
+                }) + "\n"
+                for row_id, voter_hash, booth, vote_count, timestamp in rows
+            )
+    finally:
+        db.close()
+
+
+def load_verification_totals(db=None):
+    """Cumulative counts of the incremental verification, or None."""
+    own_db = db is None
+    if own_db:
+        db = get_central_db()
+    totals = db.execute("""
+        SELECT total_votes, valid_votes, duplicate_votes
+        FROM verification_totals WHERE id = 1
+    """).fetchone()
+    if own_db:
+        db.close()
+    return totals
+
+
+def ingest_new_votes():
+    """Incremental verification: only rows past each booth's high-water mark.
+
+    The first vote seen for a voter hash is kept in voter_index; any later
+    vote for the same hash is a duplicate. Counts are cumulative across
+    runs; new_votes / new_duplicates describe this run's delta. The full
+    duplicate list is paged through /duplicates. Runs one at a time, and
+    every delta is pushed to /events viewers.
+    """
+    with ingest_lock:
+        result = ingest_since_watermarks()
+        publish_delta(result)
+    return result
+
+
+def publish_delta(result):
+    if result["new_votes"]:
+        live_updates.publish("delta", {
+            "total_votes": result["total_votes"],
+            "valid_votes": result["valid_votes"],
+            "duplicate_votes": result["duplicate_votes"],
+            "new_votes": result["new_votes"],
+            "new_duplicate_votes": len(result["new_duplicates"]),
+            "duplicates": result["new_duplicates"][:LIVE_PUSHED_DUPLICATES],
+        })
+
+
+def load_incremental_totals(db):
+    totals = load_verification_totals(db)
+    if totals is None:
+        # First incremental run: rebuild its duplicate rows together with
+        # the index. Rows stored by the full engines are left alone.
+        db.execute("DELETE FROM duplicate_votes WHERE engine = 'incremental'")
+        db.execute("DELETE FROM voter_index")
+        db.execute("DELETE FROM booth_watermarks")
+        totals = (0, 0, 0)
+    return totals
+
+
+def index_votes(db, booth_db, rows):
+    """Add (id, vote_count, voter_hash, timestamp, ...) rows of one booth
+    to voter_index and advance its watermark; returns (first votes, duplicates)."""
+    booth_name = booth_display_name(booth_db)
+    valid_votes = 0
+    duplicates = []
+    for _, vote_count, voter_hash, timestamp, *_ in rows:
+        inserted = db.execute("""
+            INSERT OR IGNORE INTO voter_index (voter_hash, booth, vote_count, timestamp)
+            VALUES (?, ?, ?, ?)
+        """, (voter_hash, booth_name, vote_count, timestamp)).rowcount
+        if inserted:
+            valid_votes += 1
+            continue
+
+        duplicates.append({
+            "voter_hash": voter_hash,
+            "booth": booth_name,
+            "vote_count": vote_count,
+            "timestamp": timestamp
+        })
+
+    db.execute("""
+        INSERT OR REPLACE INTO booth_watermarks (booth_db, last_id) VALUES (?, ?)
+    """, (booth_db, rows[-1][0]))
+    return valid_votes, duplicates
+
+
+def save_verification_totals(db, total_votes, valid_votes, duplicate_votes):
+    db.execute("""
+        INSERT OR REPLACE INTO verification_totals (id, total_votes, valid_votes, duplicate_votes)
+        VALUES (1, ?, ?, ?)
+    """, (total_votes, valid_votes, duplicate_votes))
+
+
+def ingest_since_watermarks():
+    db = get_central_db()
+    total_votes, valid_votes, duplicate_count = load_incremental_totals(db)
+
+    watermarks = dict(db.execute("SELECT booth_db, last_id FROM booth_watermarks"))
+    new_votes = 0
+    new_duplicates = []
+
+    for booth_db, rows in stream_booth_votes(detect_booth_databases(), watermarks):
+        valid, duplicates = index_votes(db, booth_db, rows)
+        valid_votes += valid
+        new_duplicates.extend(duplicates)
+        new_votes += len(rows)
+
+    save_duplicates("incremental", new_duplicates, db=db)
+    total_votes += new_votes
+    duplicate_count += len(new_duplicates)
+    save_verification_totals(db, total_votes, valid_votes, duplicate_count)
+    db.commit()
+    db.close()
+
+    return {
+        "total_votes": total_votes,
+        "valid_votes": valid_votes,
+        "duplicate_votes": duplicate_count,
+        "new_votes": new_votes,
+        "new_duplicates": new_duplicates
+    }
+
+
+def booth_watermark(booth_db, db=None):
+    """Highest ledger id of `booth_db` in the incremental index (0 if none)."""
+    own_db = db is None
+    if own_db:
+        db = get_central_db()
+    row = db.execute("""
+        SELECT last_id FROM booth_watermarks WHERE booth_db = ?
+    """, (booth_db,)).fetchone()
+    if own_db:
+        db.close()
+    return row[0] if row else 0
+
+
+def conflicting_rows(db, booth_db, watermark, rows):
+    """Ids in `rows` that contradict what was indexed from `booth_db`.
+
+    A row at or below the watermark must be the pushed row stored under
+    its id; an id missing among pushed ones was jumped over by an earlier
+    batch. The first new linked row must follow the last stored block.
+    Rows indexed from the ledger file before any push cannot be compared.
+    """
+    conflicts = []
+    old = [row for row in rows if row[0] <= watermark]
+    if old:
+        stored = dict(db.execute("""
+            SELECT ledger_id, row_hash FROM pushed_rows
+            WHERE booth_db = ? AND ledger_id BETWEEN ? AND ?
+        """, (booth_db, old[0][0], old[-1][0])))
+        first_pushed = db.execute("""
+            SELECT MIN(ledger_id) FROM pushed_rows WHERE booth_db = ?
+        """, (booth_db,)).fetchone()[0]
+        for row in old:
+            digest = stored.get(row[0])
+            if digest is None and (first_pushed is None or row[0] < first_pushed):
+                continue
+            if digest != row_hash(*row):
+                conflicts.append(row[0])
+
+    new = next((row for row in rows if row[0] > watermark), None)
+    if new is not None and new[4] is not None:
+        last = db.execute("""
+            SELECT block_hash FROM pushed_rows WHERE booth_db = ? AND ledger_id = ?
+        """, (booth_db, watermark)).fetchone()
+        if last is not None and last[0] is not None and new[4] != last[0]:
+            conflicts.append(new[0])
+    return conflicts
+
+
+def apply_ledger_batches(batches):
+    """Index (booth_db, after_id, rows) batches in one transaction.
+
+    Rows the index already has are skipped, so a batch sent twice is
+    applied once. A batch starting past its booth's watermark is not
+    applied ("gap"): rows in between would never be verified. Nor is one
+    with rows that differ from those indexed under the same ids, or that
+    do not continue the booth's chain ("conflict", e.g. two booths pushing
+    as one). Returns a {"status", "accepted", "last_id"} dict per batch.
+    """
+    global delta_imports
+    with ingest_lock:
+        db = get_central_db()
+        try:
+            total_votes, valid_votes, duplicate_count = load_incremental_totals(db)
+            watermarks = {}
+            new_votes = 0
+            new_duplicates = []
+            results = []
+            for booth_db, after_id, rows in batches:
+                if booth_db not in watermarks:
+                    watermarks[booth_db] = booth_watermark(booth_db, db)
+                watermark = watermarks[booth_db]
+                if after_id > watermark:
+                    results.append({"status": "gap", "accepted": 0, "last_id": watermark})
+                    continue
+                conflicts = conflicting_rows(db, booth_db, watermark, rows)
+                if conflicts:
+                    results.append({
+                        "status": "conflict", "accepted": 0, "last_id": watermark,
+                        "conflicting_ids": conflicts[:MAX_REPORTED_CONFLICTS],
+                    })
+                    continue
+
+                rows = [row for row in rows if row[0] > watermark]
+                if rows:
+                    db.executemany("""
+                        INSERT OR REPLACE INTO pushed_rows (booth_db, ledger_id, row_hash, block_hash)
+                        VALUES (?, ?, ?, ?)
+                    """, [(booth_db, row[0], row_hash(*row), row[5]) for row in rows])
+                    valid, duplicates = index_votes(db, booth_db, rows)
+                    valid_votes += valid
+                    new_duplicates.extend(duplicates)
+                    new_votes += len(rows)
+                    watermarks[booth_db] = rows[-1][0]
+                results.append({"status": "ok", "accepted": len(rows), "last_id": watermarks[booth_db]})
+
+            save_duplicates("incremental", new_duplicates, db=db)
+            total_votes += new_votes
+            duplicate_count += len(new_duplicates)
+            save_verification_totals(db, total_votes, valid_votes, duplicate_count)
+            db.commit()
+        finally:
+            db.close()
+
+        if new_votes:
+            delta_imports += 1
+        publish_delta({
+            "total_votes": total_votes,
+            "valid_votes": valid_votes,
+            "duplicate_votes": duplicate_count,
+            "new_votes": new_votes,
+            "new_duplicates": new_duplicates,
+        })
+    return results
+
+
+def import_ledger_delta(path):
+    """Ingest a ledger delta file (see ledger_delta) into the incremental index.
+
+    Each chunk is committed together with the booth's watermark, so after
+    an interrupted transfer the same file, or a fresh export from the
+    watermark, picks up where the import stopped.
+    """
+    with open(path, "rb") as delta:
+        booth_db, after_id = read_delta_header(delta)
+        watermark = booth_watermark(booth_db)
+        result = {"booth_db": booth_db, "new_votes": 0, "last_id": watermark}
+        for _, last_id, rows in iter_delta_chunks(delta, skip_through=watermark):
+            # Chunks are contiguous: each one starts after the one before.
+            (applied,) = apply_ledger_batches([(booth_db, after_id, rows)])
+            if applied["status"] == "gap":
+                raise ValueError(
+                    f"{booth_db}: delta starts after id {after_id}, "
+                    f"central has up to {applied['last_id']}"
+                )
+            if applied["status"] == "conflict":
+                raise ValueError(
+                    f"{booth_db}: delta rows differ from the indexed ones at ids "
+                    f"{applied['conflicting_ids']}"
+                )
+            result["new_votes"] += applied["accepted"]
+            result["last_id"] = applied["last_id"]
+            after_id = last_id
+
+    totals = load_verification_totals() or (0, 0, 0)
+    result.update(zip(("total_votes", "valid_votes", "duplicate_votes"), totals))
+    return result
+
+
+def push_signed_by(booth_db, body, signature):
+    """Whether `signature` is the HMAC of `body` under `booth_db`'s push key."""
+    # booth_db comes from the push: only a plain file name is looked up.
+    if not booth_db or os.path.basename(booth_db) != booth_db or booth_db.startswith("."):
+        return False
+    try:
+        key = read_push_key(os.path.join(BOOTH_KEYS_DIR, f"{booth_db}.key"))
+    except (OSError, ValueError):
+        return False
+    return hmac.compare_digest(sign_delta(key, body).encode(), signature.encode())
+
+
+def decode_pushed_batch(body):
+    """(booth_db, after_id, rows) from a pushed delta; ValueError if damaged."""
+    delta = io.BytesIO(body)
+    booth_db, after_id = read_delta_header(delta)
+    rows = [row for _, _, chunk in iter_delta_chunks(delta) for row in chunk]
+    return booth_db, after_id, rows
+
+
+def ledger_fingerprint():
+    """Per booth ledger: inode, size and mtime of the file and its WAL,
+    plus its highest row id. Any commit or delta import changes it."""
+    fingerprint = {"delta_imports": delta_imports}
+    for booth_db in detect_booth_databases():
+        path = os.path.join(BASE_DIR, booth_db)
+        files = ledger_files(path)
+
+        conn = sqlite3.connect(path)
+        try:
+            max_id = conn.execute("SELECT MAX(id) FROM booth_ledger").fetchone()[0]
+        except sqlite3.OperationalError:
+            max_id = None
+        finally:
+            conn.close()
+        fingerprint[booth_db] = (tuple(files), max_id)
+    return fingerprint
+
+
+def ledger_files(path):
+    """Inode, size and mtime of a ledger file and its WAL."""
+    files = []
+    for name in (path, path + "-wal"):
+        try:
+            st = os.stat(name)
+        except FileNotFoundError:
+            continue
+        files.append((st.st_ino, st.st_size, st.st_mtime_ns))
+    return tuple(files)
+
+
+def audit_ledger_copies():
+    """Check each copy's stored Merkle tree against a rebuild from its rows.
+
+    O(n) per copy, so it is a separate step from check_ledger_integrity:
+    rows can be edited without touching the tree stored beside them, and
+    only this catches it. The result is kept until the copy's files change.
+    """
+    results = {}
+    for booth_db in detect_booth_databases():
+        booth_name = booth_display_name(booth_db)
+        path = os.path.join(BASE_DIR, booth_db)
+        copy = sqlite3.connect(path)
+        try:
+            has_tree = load_merkle_state(copy) is not None
+            matches = audit_merkle(copy) if has_tree else None
+        except sqlite3.OperationalError as e:
+            results[booth_name] = {"merkle": False, "error": str(e)}
+            continue
+        finally:
+            copy.close()
+        # Stat after closing: the last connection to close checkpoints the WAL.
+        tree_audits[booth_db] = (ledger_files(path), matches)
+        results[booth_name] = {"merkle": has_tree, "stored_tree_matches": matches}
+    return results
+
+
+def stored_tree_audit(booth_db):
+    """The last audit of a copy's stored tree; None if its files changed since."""
+    audit = tree_audits.get(booth_db)
+    if audit is None or audit[0] != ledger_files(os.path.join(BASE_DIR, booth_db)):
+        return None
+    return audit[1]
+
+
+def check_ledger_integrity(original_dir=None):
+    """Compare every booth ledger copy with its original by Merkle tree.
+
+    Both stored trees are walked into differing subtrees only. A copy's
+    stored tree is trusted as far as audit_ledger_copies found it:
+    `stored_tree_matches` is that audit's result, or None when the copy
+    has not been audited since its files last changed.
+    Without an original only the copy's root is reported.
+    """
+    original_dir = original_dir or ORIGINAL_LEDGER_DIR
+    results = {}
+    for booth_db in detect_booth_databases():
+        booth_name = booth_display_name(booth_db)
+        audited = stored_tree_audit(booth_db)
+        copy = sqlite3.connect(os.path.join(BASE_DIR, booth_db))
+        try:
+            state = load_merkle_state(copy)
+            result = {"merkle": state is not None, "stored_tree_matches": audited}
+            original_path = os.path.join(original_dir, booth_db) if original_dir else None
+            if state is None:
+                result["error"] = "No Merkle tree stored with this ledger"
+            elif original_path is None or not os.path.exists(original_path):
+                result.update(root=merkle_root(copy), last_id=state[0])
+            else:
+                original = sqlite3.connect(f"file:{original_path}?mode=ro", uri=True)
+                try:
+                    result.update(diff_ledgers(original, copy))
+                except ValueError as e:
+                    result["error"] = str(e)
+                finally:
+                    original.close()
+        finally:
+            copy.close()
+        results[booth_name] = result
+    return results
+
+
+def verify_booth_chains():
+    """Validate each booth's hash chain from its last verified checkpoint."""
+    db = get_central_db()
+    checkpoints = {
+        booth_db: (ledger_id, block_hash)
+        for booth_db, ledger_id, block_hash in db.execute(
+            "SELECT booth_db, ledger_id, block_hash FROM chain_checkpoints"
+        )
+    }
+
+    results = {}
+    for booth_db in detect_booth_databases():
+        booth_name = booth_display_name(booth_db)
+        result = verify_chain(os.path.join(BASE_DIR, booth_db), since=checkpoints.get(booth_db))
+        if result["valid"] and result["checkpoint"] is not None:
+            db.execute("""
+                INSERT OR REPLACE INTO chain_checkpoints (booth_db, ledger_id, block_hash)
+                VALUES (?, ?, ?)
+            """, (booth_db, *result["checkpoint"]))
+        results[booth_name] = result
+
+    db.commit()
+    db.close()
+    return results
+
+
+# Full engines recompute everything and return the complete duplicate
+# list; "incremental" ingests only new rows (see ingest_new_votes).
+VERIFICATION_ENGINES = {
+    "incremental": ingest_new_votes,
+    "python": detect_duplicates_and_counts,
+    "sql": detect_duplicates_sql,
+    "merge": detect_duplicates_merge,
+    "sharded": detect_duplicates_sharded,
+}
+if find_duplicates_compact is not None:
+    VERIFICATION_ENGINES["compact"] = detect_duplicates_compact
+DEFAULT_ENGINE = "incremental"
+
+# Started by the first /events viewer; shared by all of them.
+live_verifier = LiveVerifier(ledger_fingerprint, ingest_new_votes)
+
+# /start_verification summaries per engine, valid while the ledgers'
+# fingerprint is unchanged; concurrent requests share one computation.
+verification_results = ResultCache()
+DELTA_FIELDS = ("new_votes", "new_duplicate_votes")
+
+# The only writer of rows pushed by booths; started by the first push.
+push_writer = BatchWriter(apply_ledger_batches)
+
 @app.route("/")
 def index():
     booths = detect_booth_databases()
-    booth_names = [b.replace(".db", "").replace("_", "-").title() for b in booths]
+    booth_names = [booth_display_name(b) for b in booths]
     return render_template(
         "index.html",
         booth_count=len(booths),
@@ -119,8 +808,143 @@ def index():
 
 @app.route("/start_verification")
 def start_verification():
-    result = detect_duplicates_and_counts()
-    return jsonify(result)
+    """Run an engine and return its counts; duplicates are read from /duplicates."""
+    engine = request.args.get("engine", DEFAULT_ENGINE)
+    if engine not in VERIFICATION_ENGINES:
+        return jsonify({"error": f"Unknown engine: {engine}"}), 400
+
+    summary, source = verification_results.get(
+        engine, ledger_fingerprint(), lambda: verification_summary(engine)
+    )
+    if source != "computed":
+        # new_votes / new_duplicate_votes describe the run that produced
+        # the summary; only the request that ran it reports them.
+        summary = {key: value for key, value in summary.items() if key not in DELTA_FIELDS}
+    return jsonify({**summary, "source": source})
+
+
+def verification_summary(engine):
+    result = VERIFICATION_ENGINES[engine]()
+    summary = {
+        key: value for key, value in result.items()
+        if key not in ("duplicates", "new_duplicates")
+    }
+    if "new_duplicates" in result:
+        summary["new_duplicate_votes"] = len(result["new_duplicates"])
+    return summary
+
+
+@app.route("/duplicates")
+def duplicates():
+    """Duplicates stored by `engine` (default: the incremental one) after
+    the `after` cursor.
+
+    JSON pages of `limit` rows with a `next_cursor` (null on the last
+    page), or every remaining row as NDJSON with `format=ndjson`.
+    """
+    engine = request.args.get("engine", DEFAULT_ENGINE)
+    if engine not in VERIFICATION_ENGINES:
+        return jsonify({"error": f"Unknown engine: {engine}"}), 400
+    after_id = request.args.get("after", 0, type=int)
+    limit = request.args.get("limit", DUPLICATE_PAGE_SIZE, type=int)
+    if after_id < 0 or not 0 < limit <= MAX_DUPLICATE_PAGE_SIZE:
+        return jsonify({"error": f"after must be >= 0 and limit in 1..{MAX_DUPLICATE_PAGE_SIZE}"}), 400
+
+    if request.args.get("format") == "ndjson":
+        return Response(stream_duplicates_ndjson(engine, after_id), mimetype="application/x-ndjson")
+    return jsonify(duplicate_page(engine, after_id, limit))
+
+
+@app.route("/events")
+def events():
+    """Server-Sent Events: a `snapshot` of the counts, then `delta`s."""
+    live_verifier.start()
+    subscriber = live_updates.subscribe()
+
+    def stream():
+        try:
+            totals = load_verification_totals() or (0, 0, 0)
+            yield format_sse("snapshot", dict(zip(
+                ("total_votes", "valid_votes", "duplicate_votes"), totals
+            )))
+            yield from subscriber.messages()
+        finally:
+            live_updates.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@app.route("/verify_chains")
+def verify_chains():
+    return jsonify(verify_booth_chains())
+
+
+@app.route("/ledger_integrity")
+def ledger_integrity():
+    return jsonify(check_ledger_integrity())
+
+
+@app.route("/ledger_audit")
+def ledger_audit():
+    return jsonify(audit_ledger_copies())
+
+
+@app.route("/ingest/watermark")
+def ingest_watermark():
+    """Where a booth's sync agent should resume: its highest indexed id."""
+    booth_db = request.args.get("booth_db", "")
+    if not booth_db:
+        return jsonify({"error": "booth_db is required"}), 400
+    return jsonify({"booth_db": booth_db, "last_id": booth_watermark(booth_db)})
+
+
+@app.route("/ingest", methods=["POST"])
+def ingest():
+    """Index a batch of rows pushed by a booth, as a ledger delta body.
+
+    The body must be signed with the key of the booth it names (401
+    otherwise). Idempotent: rows at or below the booth's watermark that
+    match the indexed ones are skipped. 409 with the watermark if the
+    batch starts past it or contradicts indexed rows; 503 with
+    Retry-After while the writer is saturated.
+    """
+    batch_id = request.headers.get("X-Batch-Id")
+    if request.content_length is None or request.content_length > MAX_PUSH_BYTES:
+        return jsonify({"error": f"A push must have a length of at most {MAX_PUSH_BYTES} bytes"}), 413
+    body = request.get_data()
+    try:
+        booth_db, _ = read_delta_header(io.BytesIO(body))
+    except ValueError as e:
+        return jsonify({"batch_id": batch_id, "error": str(e)}), 400
+    # Before decoding: unsigned bodies are never inflated.
+    if not push_signed_by(booth_db, body, request.headers.get(SIGNATURE_HEADER, "")):
+        return jsonify({"batch_id": batch_id, "error": f"Push not signed with the key of {booth_db}"}), 401
+    try:
+        batch = decode_pushed_batch(body)
+    except ValueError as e:
+        return jsonify({"batch_id": batch_id, "error": str(e)}), 400
+
+    try:
+        result = push_writer.submit(batch).result(timeout=PUSH_WAIT_SECONDS)
+    except (queue.Full, futures.TimeoutError):
+        # Safe to resend: a batch applied late is skipped the second time.
+        return jsonify({"batch_id": batch_id, "error": "Central server busy"}), 503, {
+            "Retry-After": str(PUSH_RETRY_AFTER_SECONDS)
+        }
+    return jsonify({"batch_id": batch_id, **result}), 200 if result["status"] == "ok" else 409
+
+
+@app.route("/verification_stats")
+def verification_stats():
+    return jsonify({
+        "read_timings": last_read_timings,
+        "cache": verification_results.stats(),
+        "live": {**live_verifier.stats(), "viewers": len(live_updates), "dropped": live_updates.dropped},
+        "push": push_writer.stats(),
+    })
 
 
 if __name__ == "__main__":
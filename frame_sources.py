@@ -0,0 +1,83 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+# HEADLESS FRAME SOURCES
+#
+# Stand-ins for cv2.VideoCapture(0) so the booth pipeline can be replayed
+# without a camera or display: a folder of images, a video file, or
+# synthetic voter QR codes.
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def iter_video_frames(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video {path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+def iter_image_frames(folder, canvas=None, hold=1, seed=0):
+    """Yield each image in `folder` `hold` times.
+
+    With `canvas=(width, height)` the image is pasted onto a noisy frame of
+    that size at a random position and jittered by a pixel or two between
+    held frames, the way a voter presents a card to a camera.
+    """
+    rng = np.random.default_rng(seed)
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        code = cv2.imread(os.path.join(folder, name))
+        if code is None:
+            continue
+        if canvas is None:
+            for _ in range(hold):
+                yield code
+            continue
+
+        width, height = canvas
+        size = height // 3
+        code = cv2.resize(code, (size, size), interpolation=cv2.INTER_NEAREST)
+        x = int(rng.integers(0, width - size - 8))
+        y = int(rng.integers(0, height - size - 8))
+        background = rng.integers(90, 140, (height, width, 3), dtype=np.uint8)
+        for i in range(hold):
+            frame = background.copy()
+            dx, dy = (i % 3), (i // 3) % 3
+            frame[y + dy:y + dy + size, x + dx:x + dx + size] = code
+            yield frame
+
+
+def iter_synthetic_frames(cipher, count, hold=1, prefix="SYN"):
+    """Yield grayscale QR frames for `count` freshly encrypted test voters."""
+    import qrcode  # only needed for synthetic load, not at the booth
+
+    for i in range(count):
+        voter_data = {"voter_id": f"{prefix}{i:07d}", "name": f"Synthetic Voter {i}"}
+        token = cipher.encrypt(json.dumps(voter_data).encode())
+        frame = np.array(qrcode.make(token.decode()).convert("L"))
+        for _ in range(hold):
+            yield frame
+
+
+def open_source(spec, cipher=None, hold=1):
+    """`synthetic:N`, a folder of images, or a video file."""
+    if spec.startswith("synthetic:"):
+        if cipher is None:
+            raise ValueError("Synthetic frames need the booth cipher")
+        return iter_synthetic_frames(cipher, int(spec.split(":", 1)[1]), hold=hold)
+    if os.path.isdir(spec):
+        return iter_image_frames(spec, hold=hold)
+    return iter_video_frames(spec)
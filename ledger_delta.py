@@ -0,0 +1,355 @@
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import struct
+import zlib
+from array import array
+
+from blockchain import iso_to_micros, micros_to_iso
+
+
+# LEDGER DELTA FILES
+#
+# The booth_ledger rows after a given id, packed for transfer to the
+# central server instead of copying the whole .db file:
+#
+#   header : MAGIC, version, after_id, booth_db (length-prefixed UTF-8)
+#   chunks : CHUNK_HEADER (rows, first_id, last_id, packed length, crc32)
+#            followed by the packed columns of up to DELTA_CHUNK_ROWS rows
+#
+# Packed columns: a zlib-compressed block of per-row flags and id /
+# vote_count / timestamp deltas (int64, timestamps in microseconds), then
+# the hashes as raw 32-byte digests. previous_hash is left out when it is
+# the block_hash of the row before (the normal hash link). Values that do
+# not round-trip exactly (non-canonical timestamps, non-hex hashes) are
+# carried as strings in the compressed block. Every chunk is checked
+# and imported on its own, so an interrupted transfer resumes at the
+# first chunk the central server has not committed. A chunk is inflated
+# only up to what its row count can take, so a few bytes of crafted zlib
+# cannot expand into gigabytes on the central server.
+
+MAGIC = b"OBVVDLT"
+VERSION = 1
+DELTA_CHUNK_ROWS = 50000
+# JSON bytes of raw (non-hex, non-ISO) values allowed per row in a chunk.
+MAX_RAW_BYTES_PER_ROW = 1024
+
+FILE_HEADER = struct.Struct("<7sBqH")
+CHUNK_HEADER = struct.Struct("<IqqII")
+COMPRESSED_LENGTH = struct.Struct("<I")
+
+# Per-row flags.
+HAS_PREVIOUS = 1
+LINKED_PREVIOUS = 2
+HAS_BLOCK = 4
+RAW_TIMESTAMP = 8
+RAW_VOTER_HASH = 16
+RAW_PREVIOUS = 32
+RAW_BLOCK = 64
+LINKED_BLOCK = HAS_PREVIOUS | LINKED_PREVIOUS | HAS_BLOCK
+
+# Header carrying the HMAC-SHA256 of a pushed delta under its booth's key.
+SIGNATURE_HEADER = "X-OBVV-Signature"
+
+DELTA_QUERY = """
+    SELECT id, vote_count, voter_hash, timestamp, previous_hash, block_hash
+    FROM booth_ledger WHERE id > ?
+    ORDER BY id
+"""
+
+
+def digest_of(value):
+    """32-byte digest of a hex hash, or None when it is not one."""
+    if len(value) != 64:
+        return None
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return None
+
+
+def micros_of(timestamp, seconds_cache):
+    """Integer timestamp, or None when it would not read back identically.
+
+    `seconds_cache` maps "YYYY-MM-DDTHH:MM:SS" prefixes already seen to
+    epoch seconds; votes in a chunk share few of them.
+    """
+    prefix = timestamp[:19]
+    if len(timestamp) == 26 and timestamp[19] == "." and prefix in seconds_cache:
+        fraction = timestamp[20:]
+        if fraction.isascii() and fraction.isdigit():
+            return seconds_cache[prefix] * 1000000 + int(fraction)
+    try:
+        ts_micros = iso_to_micros(timestamp)
+    except (TypeError, ValueError):
+        # Not ISO format, or with a UTC offset.
+        return None
+    if micros_to_iso(ts_micros) != timestamp:
+        return None
+    seconds_cache[prefix] = ts_micros // 1000000
+    return ts_micros
+
+
+def iso_of(ts_micros, prefix_cache):
+    """micros_to_iso, with the seconds part cached in `prefix_cache`."""
+    seconds, fraction = divmod(ts_micros, 1000000)
+    prefix = prefix_cache.get(seconds)
+    if prefix is None:
+        prefix = prefix_cache[seconds] = micros_to_iso(seconds * 1000000)[:19]
+    return f"{prefix}.{fraction:06d}"
+
+
+def pack_chunk(rows):
+    """Pack (id, vote_count, voter_hash, timestamp, previous_hash, block_hash) rows."""
+    flags = bytearray()
+    numbers = array("q")
+    digests = bytearray()
+    strings = []
+    seconds_cache = {}
+
+    last = (0, 0, 0)
+    previous_block = None
+    for ledger_id, vote_count, voter_hash, timestamp, previous_hash, block_hash in rows:
+        flag = 0
+        ts_micros = micros_of(timestamp, seconds_cache)
+        if ts_micros is None:
+            flag |= RAW_TIMESTAMP
+            strings.append(timestamp)
+            ts_micros = last[2]
+        numbers.extend((ledger_id - last[0], vote_count - last[1], ts_micros - last[2]))
+        last = (ledger_id, vote_count, ts_micros)
+
+        for value, present, raw in ((voter_hash, 0, RAW_VOTER_HASH),
+                                    (previous_hash, HAS_PREVIOUS, RAW_PREVIOUS),
+                                    (block_hash, HAS_BLOCK, RAW_BLOCK)):
+            if value is None:
+                continue
+            flag |= present
+            if present == HAS_PREVIOUS and value == previous_block:
+                flag |= LINKED_PREVIOUS
+                continue
+            digest = digest_of(value)
+            if digest is None:
+                flag |= raw
+                strings.append(value)
+            else:
+                digests += digest
+        previous_block = block_hash
+        flags.append(flag)
+
+    raw = json.dumps(strings).encode()
+    if len(raw) > column_limit(len(rows)) - 25 * len(rows):
+        raise ValueError(f"Raw values take more than {MAX_RAW_BYTES_PER_ROW} bytes per row")
+    compressed = zlib.compress(bytes(flags) + numbers.tobytes() + raw, 1)
+    return COMPRESSED_LENGTH.pack(len(compressed)) + compressed + bytes(digests)
+
+
+def column_limit(row_count):
+    """Most bytes the compressed block of a `row_count`-row chunk inflates to:
+    flags, three int64 deltas and raw values per row, plus the JSON list."""
+    return row_count * (25 + MAX_RAW_BYTES_PER_ROW) + 2
+
+
+def unpack_chunk(packed, row_count):
+    """Rows of a packed chunk; ValueError unless it holds exactly `row_count`."""
+    try:
+        return decode_chunk(packed, row_count)
+    except (zlib.error, struct.error, IndexError, StopIteration, OverflowError) as e:
+        raise ValueError(f"Damaged ledger delta chunk: {e!r}") from e
+
+
+def decode_chunk(packed, row_count):
+    (length,) = COMPRESSED_LENGTH.unpack_from(packed)
+    start = COMPRESSED_LENGTH.size
+    inflater = zlib.decompressobj()
+    limit = column_limit(row_count)
+    columns = inflater.decompress(packed[start:start + length], limit)
+    if inflater.unconsumed_tail:
+        raise ValueError(f"Compressed columns inflate past {limit} bytes for {row_count} rows")
+    if not inflater.eof or inflater.unused_data or len(packed) < start + length:
+        raise ValueError("Compressed columns truncated or followed by stray bytes")
+    if len(columns) < 25 * row_count:
+        raise ValueError(f"Compressed columns too short for {row_count} rows")
+    flags = columns[:row_count]
+    numbers = array("q")
+    numbers.frombytes(columns[row_count:row_count + 24 * row_count])
+    strings = json.loads(columns[row_count + 24 * row_count:])
+    if not isinstance(strings, list) or not all(isinstance(value, str) for value in strings):
+        raise ValueError("Raw values are not a list of strings")
+    strings = iter(strings)
+    digests = memoryview(packed)[start + length:]
+    prefix_cache = {}
+
+    rows = []
+    offset = 0
+    ledger_id = vote_count = ts_micros = 0
+    previous_block = None
+    for i, flag in enumerate(flags):
+        if numbers[3 * i] <= 0:
+            raise ValueError("Ledger ids out of order")
+        ledger_id += numbers[3 * i]
+        vote_count += numbers[3 * i + 1]
+        ts_micros += numbers[3 * i + 2]
+        timestamp = next(strings) if flag & RAW_TIMESTAMP else iso_of(ts_micros, prefix_cache)
+
+        if flag == LINKED_BLOCK:
+            # The common case: hex voter and block hash, previous hash linked.
+            voter_hash = digests[offset:offset + 32].hex()
+            block_hash = digests[offset + 32:offset + 64].hex()
+            offset += 64
+            rows.append((ledger_id, vote_count, voter_hash, timestamp, previous_block, block_hash))
+            previous_block = block_hash
+            continue
+
+        values = []
+        for present, raw in ((None, RAW_VOTER_HASH), (HAS_PREVIOUS, RAW_PREVIOUS), (HAS_BLOCK, RAW_BLOCK)):
+            if present is not None and not flag & present:
+                values.append(None)
+            elif present == HAS_PREVIOUS and flag & LINKED_PREVIOUS:
+                values.append(previous_block)
+            elif flag & raw:
+                values.append(next(strings))
+            else:
+                values.append(digests[offset:offset + 32].hex())
+                offset += 32
+        voter_hash, previous_hash, block_hash = values
+        previous_block = block_hash
+        rows.append((ledger_id, vote_count, voter_hash, timestamp, previous_hash, block_hash))
+
+    if offset != len(digests) or next(strings, None) is not None:
+        raise ValueError("Packed columns do not match the rows")
+    return rows
+
+
+def read_push_key(key_path):
+    """A booth's push key: the bytes of its key file, without a trailing newline."""
+    with open(key_path, "rb") as key_file:
+        return key_file.read().strip()
+
+
+def sign_delta(key, body):
+    """Signature of a delta pushed to /ingest: booth_db and rows are both
+    covered, so a push can only index rows under its own key's booth."""
+    return hmac.new(key, body, hashlib.sha256).hexdigest()
+
+
+def delta_header(booth_db, after_id):
+    name = booth_db.encode()
+    return FILE_HEADER.pack(MAGIC, VERSION, after_id, len(name)) + name
+
+
+def encode_chunk(rows):
+    packed = pack_chunk(rows)
+    return CHUNK_HEADER.pack(
+        len(rows), rows[0][0], rows[-1][0], len(packed), zlib.crc32(packed)
+    ) + packed
+
+
+def encode_delta(booth_db, after_id, rows, chunk_rows=DELTA_CHUNK_ROWS):
+    """A whole delta in memory, e.g. as the body of a push to /ingest."""
+    return delta_header(booth_db, after_id) + b"".join(
+        encode_chunk(rows[i:i + chunk_rows]) for i in range(0, len(rows), chunk_rows)
+    )
+
+
+def export_delta(ledger_path, out_path, after_id=0, booth_db=None, chunk_rows=DELTA_CHUNK_ROWS):
+    """Write rows with id > after_id of `ledger_path` to `out_path`.
+
+    `booth_db` names the ledger on the central server (default: the file
+    name). Returns the number of rows and chunks written.
+    """
+    if not 0 < chunk_rows <= DELTA_CHUNK_ROWS:
+        raise ValueError(f"chunk_rows must be between 1 and {DELTA_CHUNK_ROWS}")
+    booth_db = booth_db or os.path.basename(ledger_path)
+    rows_written = chunks = 0
+    conn = sqlite3.connect(ledger_path)
+    try:
+        cursor = conn.execute(DELTA_QUERY, (after_id,))
+        with open(out_path, "wb") as out:
+            out.write(delta_header(booth_db, after_id))
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                out.write(encode_chunk(rows))
+                rows_written += len(rows)
+                chunks += 1
+    finally:
+        conn.close()
+    return {"booth_db": booth_db, "after_id": after_id, "rows": rows_written, "chunks": chunks}
+
+
+def read_delta_header(delta):
+    """(booth_db, after_id) from an open delta file."""
+    header = delta.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError("Not a ledger delta file: too short")
+    magic, version, after_id, name_length = FILE_HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a ledger delta file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported ledger delta version: {version}")
+    name = delta.read(name_length)
+    if len(name) < name_length:
+        raise ValueError("Ledger delta truncated in its header")
+    return name.decode(), after_id
+
+
+def iter_delta_chunks(delta, skip_through=0):
+    """Yield (first_id, last_id, rows) for each chunk of an open delta file.
+
+    Chunks ending at or before `skip_through` are stepped over without
+    being unpacked. Raises ValueError at a truncated or corrupt chunk;
+    the chunks before it have been yielded.
+    """
+    while True:
+        header = delta.read(CHUNK_HEADER.size)
+        if not header:
+            return
+        if len(header) < CHUNK_HEADER.size:
+            raise ValueError("Ledger delta truncated inside a chunk header")
+        row_count, first_id, last_id, length, checksum = CHUNK_HEADER.unpack(header)
+        if not 0 < row_count <= min(DELTA_CHUNK_ROWS, last_id - first_id + 1):
+            raise ValueError(f"Bad row count {row_count} in the chunk starting at id {first_id}")
+        if last_id <= skip_through:
+            delta.seek(length, 1)
+            continue
+        packed = delta.read(length)
+        if len(packed) < length:
+            raise ValueError(f"Ledger delta truncated in the chunk starting at id {first_id}")
+        if zlib.crc32(packed) != checksum:
+            raise ValueError(f"Checksum mismatch in the chunk starting at id {first_id}")
+        rows = unpack_chunk(packed, row_count)
+        if rows[0][0] != first_id or rows[-1][0] != last_id:
+            raise ValueError(f"Chunk ids do not match its header at id {first_id}")
+        yield first_id, last_id, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OBVV ledger delta files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="booth side: write rows after an id")
+    export.add_argument("ledger")
+    export.add_argument("output")
+    export.add_argument("--after", type=int, default=0, help="last id the central server has")
+    export.add_argument("--booth-db", help="ledger name on the central server")
+    load = commands.add_parser("import", help="central side: ingest delta files")
+    load.add_argument("deltas", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(export_delta(args.ledger, args.output, args.after, args.booth_db))
+        return
+
+    # Only the central server needs Flask and the central database.
+    import central_verification
+    central_verification.init_central_db()
+    for path in args.deltas:
+        print(central_verification.import_ledger_delta(path))
+
+
+if __name__ == "__main__":
+    main()
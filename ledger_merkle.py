@@ -0,0 +1,256 @@
+import hashlib
+import sqlite3
+
+
+# LEDGER MERKLE TREE
+#
+# A binary Merkle tree over booth_ledger rows, stored in the ledger itself
+# and extended in the same transaction as every batch of votes. Leaves
+# are buckets of BUCKET_ROWS consecutive ids (bucket b holds ids
+# b*BUCKET_ROWS+1 .. (b+1)*BUCKET_ROWS), so a missing or altered row only
+# changes its own bucket and the path above it. A bucket hashes as a
+# running sha256 over its row hashes, so appending never rereads old
+# rows. A node at `level` covers 2**level buckets; an absent child hashes
+# as 32 zero bytes. Two ledgers are compared by walking down from the
+# roots into differing subtrees only: O(log n) node comparisons per
+# differing bucket.
+
+BUCKET_ROWS = 64
+MAX_REPORTED_DIFFERENCES = 100
+STREAM_CHUNK = 10000
+
+EMPTY = bytes(32)
+
+MERKLE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS merkle_nodes (
+        level INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        hash BLOB NOT NULL,
+        PRIMARY KEY (level, position)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS merkle_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_id INTEGER NOT NULL,
+        top_level INTEGER NOT NULL
+    )
+    """,
+)
+
+
+def create_merkle_tables(conn):
+    for statement in MERKLE_SCHEMA:
+        conn.execute(statement)
+
+
+def row_hash(ledger_id, vote_count, voter_hash, timestamp, previous_hash, block_hash):
+    return hashlib.sha256(
+        f"{ledger_id}|{vote_count}|{voter_hash}|{timestamp}|"
+        f"{previous_hash or ''}|{block_hash or ''}".encode()
+    ).digest()
+
+
+def pair_hash(left, right):
+    return hashlib.sha256((left or EMPTY) + (right or EMPTY)).digest()
+
+
+def extend_bucket(digest, row_digest):
+    return hashlib.sha256((digest or EMPTY) + row_digest).digest()
+
+
+def bucket_of(ledger_id):
+    return (ledger_id - 1) // BUCKET_ROWS
+
+
+def bucket_rows(conn, bucket):
+    """{id: row hash} for the rows of one bucket."""
+    first_id = bucket * BUCKET_ROWS + 1
+    return {
+        row[0]: row_hash(*row)
+        for row in conn.execute("""
+            SELECT id, vote_count, voter_hash, timestamp, previous_hash, block_hash
+            FROM booth_ledger WHERE id BETWEEN ? AND ?
+            ORDER BY id
+        """, (first_id, first_id + BUCKET_ROWS - 1))
+    }
+
+
+def load_merkle_state(tree):
+    """(last_id, top_level) of a stored tree; (0, -1) while it is empty and
+    None when the ledger has no Merkle tables."""
+    try:
+        state = tree.execute("SELECT last_id, top_level FROM merkle_state WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return state or (0, -1)
+
+
+def update_merkle(conn, tree=None):
+    """Extend the tree in `tree` (default: `conn`) with rows added since its
+    last update; returns the root. Cost is proportional to the new rows
+    plus the tree height. Run inside the caller's transaction."""
+    tree = tree or conn
+    last_id, old_top = load_merkle_state(tree)
+
+    cursor = conn.execute("""
+        SELECT id, vote_count, voter_hash, timestamp, previous_hash, block_hash
+        FROM booth_ledger WHERE id > ?
+        ORDER BY id
+    """, (last_id,))
+
+    # A bucket hash is a running hash over its rows, so the bucket of the
+    # first new row continues from its stored (partial) hash.
+    first_bucket = last_id // BUCKET_ROWS
+    level_nodes = {}
+    bucket = first_bucket
+    digest = read_node(tree, 0, first_bucket)
+    new_last_id = last_id
+    while True:
+        rows = cursor.fetchmany(STREAM_CHUNK)
+        if not rows:
+            break
+        for row in rows:
+            row_bucket = bucket_of(row[0])
+            if row_bucket != bucket:
+                if digest is not None:
+                    level_nodes[bucket] = digest
+                bucket, digest = row_bucket, None
+            digest = extend_bucket(digest, row_hash(*row))
+            new_last_id = row[0]
+    if digest is not None:
+        level_nodes[bucket] = digest
+
+    if new_last_id == last_id:
+        return merkle_root(tree)
+
+    last_bucket = bucket_of(new_last_id)
+    top = max(old_top, last_bucket.bit_length())
+    changed = [(0, position, node) for position, node in level_nodes.items()]
+
+    for level in range(1, top + 1):
+        below, level_nodes = level_nodes, {}
+        positions = set(range(first_bucket >> level, (last_bucket >> level) + 1))
+        if level > old_top:
+            # A new level: its first node covers the rows that were there before.
+            positions.add(0)
+        for position in positions:
+            left = below.get(2 * position) or read_node(tree, level - 1, 2 * position)
+            right = below.get(2 * position + 1) or read_node(tree, level - 1, 2 * position + 1)
+            level_nodes[position] = pair_hash(left, right)
+        changed.extend((level, position, node) for position, node in level_nodes.items())
+
+    tree.executemany("""
+        INSERT OR REPLACE INTO merkle_nodes (level, position, hash) VALUES (?, ?, ?)
+    """, changed)
+    tree.execute("""
+        INSERT OR REPLACE INTO merkle_state (id, last_id, top_level) VALUES (1, ?, ?)
+    """, (new_last_id, top))
+    return level_nodes[0].hex()
+
+
+def read_node(tree, level, position):
+    row = tree.execute("""
+        SELECT hash FROM merkle_nodes WHERE level = ? AND position = ?
+    """, (level, position)).fetchone()
+    return row[0] if row else None
+
+
+def node_at(tree, top, level, position):
+    """Node hash, also above the stored top: the root paired with empties."""
+    if level <= top:
+        return read_node(tree, level, position)
+    if position != 0:
+        return None
+    digest = read_node(tree, top, 0)
+    if digest is None:
+        return None
+    for _ in range(level - top):
+        digest = pair_hash(digest, None)
+    return digest
+
+
+def merkle_root(tree):
+    state = load_merkle_state(tree)
+    if state is None:
+        return None
+    root = read_node(tree, state[1], 0)
+    return root.hex() if root else None
+
+
+def diff_ledgers(conn_a, conn_b, tree_a=None, tree_b=None, limit=MAX_REPORTED_DIFFERENCES):
+    """Compare two ledgers through their Merkle trees.
+
+    Only subtrees whose hashes differ are descended into; inside a
+    differing bucket rows are compared by id. Returns the roots, up to
+    `limit` differing ids, their count and the hash comparisons made.
+    Trees are taken as given: for a ledger whose rows may have been edited
+    behind its tree, pass rebuild_merkle(conn) as its tree.
+    """
+    tree_a = tree_a or conn_a
+    tree_b = tree_b or conn_b
+    state_a = load_merkle_state(tree_a)
+    state_b = load_merkle_state(tree_b)
+    if state_a is None or state_b is None:
+        raise ValueError("Both ledgers need a Merkle tree (see update_merkle)")
+    top_a, top_b = state_a[1], state_b[1]
+    top = max(top_a, top_b)
+
+    comparisons = 0
+    differing = []
+    difference_count = 0
+    stack = [(top, 0)]
+    while stack:
+        level, position = stack.pop()
+        comparisons += 1
+        if node_at(tree_a, top_a, level, position) == node_at(tree_b, top_b, level, position):
+            continue
+        if level > 0:
+            # Right child first so the left subtree is walked first.
+            stack.append((level - 1, 2 * position + 1))
+            stack.append((level - 1, 2 * position))
+            continue
+
+        rows_a = bucket_rows(conn_a, position)
+        rows_b = bucket_rows(conn_b, position)
+        for ledger_id in sorted(rows_a.keys() | rows_b.keys()):
+            comparisons += 1
+            if rows_a.get(ledger_id) != rows_b.get(ledger_id):
+                difference_count += 1
+                if len(differing) < limit:
+                    differing.append(ledger_id)
+
+    return {
+        "identical": difference_count == 0 and state_a[0] == state_b[0],
+        "root_a": merkle_root(tree_a),
+        "root_b": merkle_root(tree_b),
+        "last_id_a": state_a[0],
+        "last_id_b": state_b[0],
+        "difference_count": difference_count,
+        "differing_ids": differing,
+        "comparisons": comparisons,
+    }
+
+
+def rebuild_merkle(conn):
+    """An in-memory tree built from `conn`'s rows (O(n)), ignoring any tree
+    stored with them: pass it as `tree_b` to diff a ledger that may have
+    been edited behind its tree. The caller closes it."""
+    scratch = sqlite3.connect(":memory:")
+    try:
+        create_merkle_tables(scratch)
+        update_merkle(conn, tree=scratch)
+    except BaseException:
+        scratch.close()
+        raise
+    return scratch
+
+
+def audit_merkle(conn):
+    """Rebuild the tree from the rows (O(n)) and check the stored root."""
+    scratch = rebuild_merkle(conn)
+    try:
+        return merkle_root(scratch) == merkle_root(conn)
+    finally:
+        scratch.close()
@@ -0,0 +1,141 @@
+import multiprocessing
+import queue
+import sqlite3
+import threading
+import time
+
+
+# PARALLEL, STREAMING BOOTH LEDGER READS
+#
+# Booth ledgers are read concurrently by a pool of threads or processes.
+# Each booth's rows arrive as fetchmany chunks through its own bounded
+# queue and are yielded strictly in booth order, so results match a
+# sequential read while peak memory stays at a few chunks per booth.
+
+READ_WORKERS = 4
+READ_CHUNK = 5000
+QUEUE_DEPTH = 4
+# How often a reader blocked on a full queue checks whether the consumer
+# has gone away.
+PUT_POLL_SECONDS = 0.1
+
+
+def stream_ledger(path, after_id=0, chunk_size=READ_CHUNK):
+    """Yield chunks of (id, vote_count, voter_hash, timestamp) rows."""
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute("""
+            SELECT id, vote_count, voter_hash, timestamp
+            FROM booth_ledger
+            WHERE id > ?
+            ORDER BY id
+        """, (after_id,))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        conn.close()
+
+
+def put_until_stopped(out, message, stop):
+    """Put `message` on `out` unless `stop` is set first; False if stopped."""
+    while not stop.is_set():
+        try:
+            out.put(message, timeout=PUT_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def read_booths(jobs, queues, chunk_size, stop):
+    """Reader worker: stream every assigned (position, path, after_id) in order
+    until `stop` is set."""
+    for position, path, after_id in jobs:
+        out = queues[position]
+        rows_read = 0
+        read_seconds = 0.0
+        try:
+            chunks = stream_ledger(path, after_id, chunk_size)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    rows = next(chunks, None)
+                    read_seconds += time.perf_counter() - start
+                    if rows is None:
+                        break
+                    rows_read += len(rows)
+                    if not put_until_stopped(out, ("rows", rows), stop):
+                        return
+            finally:
+                chunks.close()
+        except sqlite3.Error as e:
+            if not put_until_stopped(out, ("error", f"{path}: {e}"), stop):
+                return
+            continue
+        if not put_until_stopped(out, ("done", rows_read, read_seconds), stop):
+            return
+
+
+def iter_ledger_chunks(sources, timings=None, workers=READ_WORKERS, chunk_size=READ_CHUNK,
+                       use_processes=False, depth=QUEUE_DEPTH):
+    """Yield (position, rows) for `sources` = [(path, after_id), ...] in order.
+
+    Booth i is read by worker i % workers. If `timings` is a dict it is
+    filled with {position: {"rows", "read_seconds"}}; read_seconds is time
+    spent in SQLite, not time waiting for the consumer.
+    """
+    workers = max(1, min(workers, len(sources)))
+    if use_processes:
+        ctx = multiprocessing.get_context("spawn")
+        queues = [ctx.Queue(depth) for _ in sources]
+        stop = ctx.Event()
+        start_worker = ctx.Process
+    else:
+        queues = [queue.Queue(depth) for _ in sources]
+        stop = threading.Event()
+        start_worker = threading.Thread
+
+    jobs = [[] for _ in range(workers)]
+    for position, (path, after_id) in enumerate(sources):
+        jobs[position % workers].append((position, path, after_id))
+
+    readers = [
+        start_worker(target=read_booths, args=(assigned, queues, chunk_size, stop), daemon=True)
+        for assigned in jobs
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        for position in range(len(sources)):
+            while True:
+                message = queues[position].get()
+                if message[0] == "rows":
+                    yield position, message[1]
+                    continue
+                if message[0] == "error":
+                    raise RuntimeError(f"Cannot read booth ledger {message[1]}")
+                if timings is not None:
+                    timings[position] = {
+                        "rows": message[1],
+                        "read_seconds": round(message[2], 4)
+                    }
+                break
+    finally:
+        # The consumer may have stopped early (error, close(), client gone):
+        # release readers blocked on a full queue before waiting for them.
+        stop.set()
+        for out in queues:
+            while True:
+                try:
+                    out.get_nowait()
+                except queue.Empty:
+                    break
+        for reader in readers:
+            reader.join(timeout=1)
+            if use_processes and reader.is_alive():
+                reader.terminate()
+                reader.join()
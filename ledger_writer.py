@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+import time
+
+from ledger_merkle import create_merkle_tables, update_merkle
+
+
+# DURABILITY POLICIES
+#
+#   strict : every vote is committed (and fsynced) before save_vote returns
+#   group  : votes are queued and committed together every `group_size`
+#            votes or `group_interval_ms` milliseconds by a background flusher
+
+STRICT = "strict"
+GROUP = "group"
+
+LEDGER_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS booth_ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vote_count INTEGER NOT NULL,
+        voter_hash TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        previous_hash TEXT,
+        block_hash TEXT
+    )
+"""
+
+# Columns added after the first ledgers were written; NULL on those rows.
+LEDGER_MIGRATIONS = {
+    "previous_hash": "ALTER TABLE booth_ledger ADD COLUMN previous_hash TEXT",
+    "block_hash": "ALTER TABLE booth_ledger ADD COLUMN block_hash TEXT",
+}
+
+# Single-row checkpoint of the blockchain tip, written in the same
+# transaction as the votes so a restarted booth resumes in O(1).
+CHAIN_TIP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chain_tip (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        ledger_id INTEGER NOT NULL,
+        block_index INTEGER NOT NULL,
+        block_hash TEXT NOT NULL
+    )
+"""
+
+
+class LedgerWriter:
+    """Long-lived writer owning a single WAL-mode connection to a booth ledger."""
+
+    def __init__(self, db_name, durability=STRICT, group_size=64, group_interval_ms=20):
+        if durability not in (STRICT, GROUP):
+            raise ValueError(f"Unknown durability policy: {durability}")
+
+        self.db_name = db_name
+        self.durability = durability
+        self.group_size = group_size
+        self.group_interval = group_interval_ms / 1000.0
+
+        self.conn = sqlite3.connect(db_name, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(LEDGER_SCHEMA)
+        self.conn.execute(CHAIN_TIP_SCHEMA)
+        migrate_ledger(self.conn)
+        # Lets Blockchain.get_block load blocks outside its in-memory window.
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_booth_ledger_vote_count
+            ON booth_ledger (vote_count)
+        """)
+        # The Merkle tree is extended with every batch; catch up on rows
+        # written before it existed (a one-off O(n) build).
+        create_merkle_tables(self.conn)
+        self.conn.execute("BEGIN IMMEDIATE")
+        update_merkle(self.conn)
+        self.conn.execute("COMMIT")
+
+        self._io_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending = []
+        self._queued_seq = 0
+        self._durable_seq = 0
+        self._closed = False
+        self._error = None
+
+        self._flusher = None
+        if durability == GROUP:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    # ---------- writing ----------
+
+    def save_vote(self, vote_count, voter_hash, timestamp, previous_hash=None, block_hash=None):
+        """Queue a vote and return its sequence number.
+
+        In strict mode the vote is durable when this returns. In group mode
+        call wait_durable(seq) before telling the voter it was recorded.
+        When `block_hash` is given the chain_tip checkpoint moves to this vote.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("LedgerWriter is closed")
+            self._queued_seq += 1
+            seq = self._queued_seq
+            row = (vote_count, voter_hash, timestamp, previous_hash, block_hash)
+            self._pending.append((seq, row))
+            if self.durability == GROUP and len(self._pending) >= self.group_size:
+                self._cond.notify_all()
+
+        if self.durability == STRICT:
+            self._commit_pending()
+            if not self.wait_durable(seq, timeout=0):
+                raise self._error or RuntimeError("Vote was not committed")
+
+        return seq
+
+    def wait_durable(self, seq, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._durable_seq < seq:
+                if self._error is not None:
+                    raise self._error
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def flush(self):
+        self._commit_pending()
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._flusher is not None:
+            self._flusher.join()
+
+        self._commit_pending()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---------- internals ----------
+
+    def _commit_pending(self):
+        with self._io_lock:
+            with self._cond:
+                batch = self._pending
+                self._pending = []
+            if not batch:
+                return
+
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.executemany("""
+                    INSERT INTO booth_ledger
+                        (vote_count, voter_hash, timestamp, previous_hash, block_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [row for _, row in batch])
+                self._write_chain_tip(batch)
+                update_merkle(self.conn)
+                self.conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                with self._cond:
+                    if self.durability == GROUP:
+                        # Keep the batch queued so the flusher retries it.
+                        self._pending = batch + self._pending
+                    self._error = e
+                    self._cond.notify_all()
+                raise
+
+            with self._cond:
+                self._durable_seq = batch[-1][0]
+                self._error = None
+                self._cond.notify_all()
+
+    def _write_chain_tip(self, batch):
+        _, (vote_count, _, _, _, block_hash) = batch[-1]
+        if block_hash is None:
+            return
+        self.conn.execute("""
+            INSERT OR REPLACE INTO chain_tip (id, ledger_id, block_index, block_hash)
+            VALUES (1, last_insert_rowid(), ?, ?)
+        """, (vote_count, block_hash))
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if len(self._pending) < self.group_size:
+                    self._cond.wait(self.group_interval)
+            try:
+                self._commit_pending()
+            except sqlite3.Error:
+                # Surfaced to callers through wait_durable; retried next tick.
+                time.sleep(self.group_interval)
+
+
+def migrate_ledger(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(booth_ledger)")}
+    for column, statement in LEDGER_MIGRATIONS.items():
+        if column not in columns:
+            conn.execute(statement)
@@ -0,0 +1,365 @@
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+from pyzbar.pyzbar import decode
+
+
+# DETECTION STRATEGIES
+#
+#   full     : pyzbar on every full-resolution BGR frame (original behaviour)
+#   adaptive : grayscale once, skip frames nearly identical to the last hit,
+#              try a downscaled pass, then full resolution inside the last
+#              region a symbol was found in
+
+FULL_FRAME = "full"
+ADAPTIVE = "adaptive"
+
+
+class FullFrameDetector:
+    def __init__(self):
+        self.frames = 0
+        self.hits = 0
+
+    def detect(self, frame):
+        self.frames += 1
+        decoded_objects = decode(frame)
+        if decoded_objects:
+            self.hits += 1
+        return decoded_objects
+
+    def stats(self):
+        return {"frames": self.frames, "hits": self.hits}
+
+
+class AdaptiveDetector:
+    def __init__(self, scale=0.5, roi_margin=0.3, skip_threshold=2.0, full_scan_interval=15):
+        self.scale = scale
+        self.roi_margin = roi_margin
+        self.skip_threshold = skip_threshold
+        self.full_scan_interval = full_scan_interval
+
+        self._roi = None          # (x, y, w, h) in full-resolution pixels
+        self._last_hit = None     # downscaled gray frame of the last hit
+        self._misses = 0
+
+        self.frames = 0
+        self.skipped = 0
+        self.small_hits = 0
+        self.roi_hits = 0
+        self.full_hits = 0
+
+    def detect(self, frame):
+        self.frames += 1
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, None, fx=self.scale, fy=self.scale,
+                           interpolation=cv2.INTER_AREA)
+
+        if self._last_hit is not None and self._last_hit.shape == small.shape:
+            if cv2.absdiff(small, self._last_hit).mean() < self.skip_threshold:
+                # Same card, same position: the result is already known.
+                self.skipped += 1
+                return []
+
+        decoded_objects = decode(small)
+        if decoded_objects:
+            self.small_hits += 1
+            return self._hit(small, decoded_objects, self.scale)
+
+        if self._roi is not None:
+            x, y, w, h = self._roi
+            decoded_objects = decode(gray[y:y + h, x:x + w])
+            if decoded_objects:
+                self.roi_hits += 1
+                return self._hit(small, decoded_objects, 1.0, offset=(x, y))
+
+        self._misses += 1
+        if self.full_scan_interval and self._misses % self.full_scan_interval == 0:
+            # Periodic full-resolution pass for codes too small to survive downscaling.
+            decoded_objects = decode(gray)
+            if decoded_objects:
+                self.full_hits += 1
+                return self._hit(small, decoded_objects, 1.0)
+
+        self._last_hit = None
+        return []
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "small_hits": self.small_hits,
+            "roi_hits": self.roi_hits,
+            "full_hits": self.full_hits,
+        }
+
+    def _hit(self, small, decoded_objects, scale, offset=(0, 0)):
+        self._misses = 0
+        self._last_hit = small
+
+        left, top, width, height = decoded_objects[0].rect
+        x = offset[0] + left / scale
+        y = offset[1] + top / scale
+        w = width / scale
+        h = height / scale
+        mx = w * self.roi_margin
+        my = h * self.roi_margin
+        frame_h = int(small.shape[0] / self.scale)
+        frame_w = int(small.shape[1] / self.scale)
+
+        x0 = max(int(x - mx), 0)
+        y0 = max(int(y - my), 0)
+        x1 = min(int(x + w + mx), frame_w)
+        y1 = min(int(y + h + my), frame_h)
+        self._roi = (x0, y0, x1 - x0, y1 - y0)
+        return decoded_objects
+
+
+def make_detector(mode):
+    if mode == FULL_FRAME:
+        return FullFrameDetector()
+    if mode == ADAPTIVE:
+        return AdaptiveDetector()
+    raise ValueError(f"Unknown detection mode: {mode}")
+
+
+class DecryptCache:
+    """Recent decrypt outcomes keyed on the raw QR bytes.
+
+    A card held in front of the camera decodes on many consecutive frames;
+    within `ttl` seconds repeats cost a dict lookup instead of a Fernet
+    HMAC check. Rejections are cached too, stored as None.
+    """
+
+    def __init__(self, max_entries=64, ttl=3.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data):
+        """Return (found, voter_data)."""
+        entry = self._entries.get(data)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, voter_data = entry
+        if expires_at < time.monotonic():
+            del self._entries[data]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(data)
+        self.hits += 1
+        return True, voter_data
+
+    def put(self, data, voter_data):
+        self._entries[data] = (time.monotonic() + self.ttl, voter_data)
+        self._entries.move_to_end(data)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class QRScanner:
+    """Persistent camera + background decode pipeline for a booth.
+
+    One capture thread keeps the camera open and always holds the latest
+    frame; `decoder_workers` threads run pyzbar on the newest unclaimed frame
+    while a scan is armed. The booth loop only calls next_voter().
+    """
+
+    def __init__(self, cipher, camera_index=0, decoder_workers=1, detection=FULL_FRAME,
+                 show_preview=True, window_name="Scan Voter QR Code"):
+        self.cipher = cipher
+        self.detection = detection
+        self.camera_index = camera_index
+        self.decoder_workers = decoder_workers
+        self.show_preview = show_preview
+        self.window_name = window_name
+
+        self._cap = None
+        self._threads = []
+        self._detectors = []
+        self._running = threading.Event()
+        self._armed = threading.Event()
+        self._results = queue.Queue()
+        self._decrypt_cache = DecryptCache()
+
+        self._frame_cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._frame_time = 0.0
+        self._claimed_id = 0
+
+        self.frames_captured = 0
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.decode_seconds = 0.0
+        self.latencies = []
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self._cap = cv2.VideoCapture(self.camera_index)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"Cannot open camera {self.camera_index}")
+
+        self._running.set()
+        self._threads = [threading.Thread(target=self._capture_loop, daemon=True)]
+        self._detectors = [make_detector(self.detection) for _ in range(self.decoder_workers)]
+        for detector in self._detectors:
+            self._threads.append(
+                threading.Thread(target=self._decode_loop, args=(detector,), daemon=True)
+            )
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._running.clear()
+        self._armed.clear()
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=1)
+        self._threads = []
+
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        if self.show_preview:
+            cv2.destroyAllWindows()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ---------- booth API ----------
+
+    def next_voter(self, timeout=None):
+        """Block until a valid voter QR is decoded.
+
+        Returns the decrypted voter dict, or None if the operator pressed
+        'q' in the preview window or `timeout` seconds passed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        # Anything decoded before this scan was armed belongs to a previous voter.
+        self._drain_results()
+        with self._frame_cond:
+            self._claimed_id = self._frame_id
+        self._armed.set()
+
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    data, frame_time = self._results.get(timeout=0.01)
+                except queue.Empty:
+                    if self._poll_preview():
+                        return None
+                    continue
+
+                voter_data = self.validate(data)
+                if voter_data is not None:
+                    self.latencies.append(time.monotonic() - frame_time)
+                    return voter_data
+            return None
+        finally:
+            self._armed.clear()
+            if self.show_preview:
+                cv2.destroyWindow(self.window_name)
+                cv2.waitKey(1)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_decoded": self.frames_decoded,
+            "frames_dropped": self.frames_dropped,
+            "avg_decode_ms": 1000 * self.decode_seconds / max(self.frames_decoded, 1),
+            "p50_latency_ms": 1000 * lat[len(lat) // 2] if lat else None,
+            "max_latency_ms": 1000 * lat[-1] if lat else None,
+            "decrypt_cache_hits": self._decrypt_cache.hits,
+            "decrypt_cache_misses": self._decrypt_cache.misses,
+            "detectors": [d.stats() for d in self._detectors],
+        }
+
+    # ---------- internals ----------
+
+    def validate(self, data):
+        """Decrypt a raw QR payload; returns the voter dict or None."""
+        found, voter_data = self._decrypt_cache.get(data)
+        if found:
+            # Already reported if it was rejected; stay quiet for repeat frames.
+            return dict(voter_data) if voter_data is not None else None
+
+        try:
+            decrypted = self.cipher.decrypt(data)
+            voter_data = json.loads(decrypted.decode())
+        except Exception:
+            print("🚨 Unauthorized or invalid QR")
+            voter_data = None
+
+        self._decrypt_cache.put(data, voter_data)
+        return dict(voter_data) if voter_data is not None else None
+
+    def _drain_results(self):
+        while True:
+            try:
+                self._results.get_nowait()
+            except queue.Empty:
+                return
+
+    def _poll_preview(self):
+        if not self.show_preview:
+            return False
+        with self._frame_cond:
+            frame = self._frame
+        if frame is not None:
+            cv2.imshow(self.window_name, frame)
+        return cv2.waitKey(1) & 0xFF == ord('q')
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            ret, frame = self._cap.read()
+            if not ret:
+                time.sleep(0.005)
+                continue
+            with self._frame_cond:
+                self._frame = frame
+                self._frame_id += 1
+                self._frame_time = time.monotonic()
+                self.frames_captured += 1
+                self._frame_cond.notify()
+
+    def _decode_loop(self, detector):
+        while self._running.is_set():
+            with self._frame_cond:
+                while self._running.is_set() and not (
+                    self._armed.is_set() and self._frame_id > self._claimed_id
+                ):
+                    self._frame_cond.wait(0.05)
+                if not self._running.is_set():
+                    return
+                # Frames overwritten before any decoder claimed them are dropped.
+                self.frames_dropped += self._frame_id - self._claimed_id - 1
+                self._claimed_id = self._frame_id
+                frame, frame_time = self._frame, self._frame_time
+
+            start = time.perf_counter()
+            decoded_objects = detector.detect(frame)
+            elapsed = time.perf_counter() - start
+
+            with self._frame_cond:
+                self.frames_decoded += 1
+                self.decode_seconds += elapsed
+
+            for obj in decoded_objects:
+                self._results.put((obj.data, frame_time))
@@ -0,0 +1,31 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Blockchain  # noqa: E402
+from ledger_writer import LedgerWriter  # noqa: E402
+
+
+def voter_hash(n):
+    return hashlib.sha256(str(n).encode()).hexdigest()
+
+
+def write_votes(db_name, count, chain=None, first_voter=0):
+    """Append `count` linked votes to `db_name`; returns the chain."""
+    chain = chain or Blockchain.resume(db_name)
+    writer = LedgerWriter(db_name)
+    for n in range(first_voter, first_voter + count):
+        block = chain.add_block(voter_hash(n), "2026-02-05T21:41:56.958952")
+        writer.save_vote(block.index, block.voter_hash, block.timestamp,
+                         previous_hash=block.previous_hash, block_hash=block.hash)
+    writer.close()
+    return chain
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return str(tmp_path / "booth_ledger_1.db")
@@ -0,0 +1,34 @@
+import sqlite3
+
+import pytest
+
+from blockchain import verify_chain
+
+# booth imports the scanner stack (OpenCV, zbar).
+booth = pytest.importorskip("booth", exc_type=ImportError)
+
+
+def test_failed_strict_commit_leaves_chain_unchanged(ledger, monkeypatch):
+    recorder = booth.BoothRecorder(ledger, durability=booth.STRICT)
+    recorder.record("ABC1234567")
+    tip = recorder.chain.get_latest_block()
+
+    def failing_insert(*args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(recorder.ledger, "save_vote", failing_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        recorder.record("XYZ7654321")
+    assert recorder.chain.get_latest_block() is tip
+    assert booth.hash_voter_id("XYZ7654321") not in recorder.voted
+
+    monkeypatch.undo()
+    block = recorder.record("XYZ7654321")
+    assert block.index == tip.index + 1
+    recorder.close()
+    assert verify_chain(ledger)["valid"]
+
+
+def test_unknown_detection_mode_is_rejected():
+    with pytest.raises(SystemExit):
+        booth.main(["--detection", "ful"])
@@ -0,0 +1,35 @@
+import pytest
+
+from conftest import voter_hash, write_votes
+
+np = pytest.importorskip("numpy")
+
+from central_compact import MAX_ROW_ID, CompactVoteIndex, find_duplicates_compact  # noqa: E402
+from central_sql import find_duplicates_sql  # noqa: E402
+
+
+def test_matches_sql_engine(tmp_path):
+    booths = []
+    for booth in range(3):
+        path = str(tmp_path / f"booth_ledger_{booth}.db")
+        # Voters 0-39 vote at every booth; each booth also has its own.
+        write_votes(path, 40)
+        write_votes(path, 20, first_voter=1000 * (booth + 1))
+        booths.append((f"Booth-{booth}", path))
+
+    compact = find_duplicates_compact(booths, workers=2)
+    assert compact == find_duplicates_sql(booths)
+    assert compact["duplicate_votes"] == 80
+
+
+def test_values_past_the_column_widths_are_refused():
+    row = (1, 1, voter_hash(0), "2026-02-05T21:41:56.958952")
+    index = CompactVoteIndex(4)
+    with pytest.raises(ValueError):
+        index.append(70000, [row])
+    with pytest.raises(ValueError):
+        index.append(0, [(MAX_ROW_ID + 1,) + row[1:]])
+    assert index.size == 0
+
+    index.append(0, [(MAX_ROW_ID,) + row[1:]])
+    assert index.row_id[0] == MAX_ROW_ID
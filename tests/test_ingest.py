@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+import pytest
+
+from conftest import write_votes
+from ledger_delta import (
+    CHUNK_HEADER, COMPRESSED_LENGTH, DELTA_QUERY, SIGNATURE_HEADER, delta_header, encode_delta,
+    sign_delta
+)
+
+central_verification = pytest.importorskip("central_verification")
+
+KEYS = {"booth_ledger_1.db": b"key-of-booth-1", "booth_ledger_2.db": b"key-of-booth-2"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    keys_dir = tmp_path / "booth_keys"
+    keys_dir.mkdir()
+    for booth_db, key in KEYS.items():
+        (keys_dir / f"{booth_db}.key").write_bytes(key + b"\n")
+    monkeypatch.setattr(central_verification, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(central_verification, "CENTRAL_DB", str(tmp_path / "central_duplicates.db"))
+    monkeypatch.setattr(central_verification, "BOOTH_KEYS_DIR", str(keys_dir))
+    central_verification.init_central_db()
+    return central_verification.app.test_client()
+
+
+def ledger_rows(path, count, first_voter=0):
+    write_votes(path, count, first_voter=first_voter)
+    conn = sqlite3.connect(path)
+    rows = conn.execute(DELTA_QUERY, (0,)).fetchall()
+    conn.close()
+    return rows
+
+
+def push(client, body, key=KEYS["booth_ledger_1.db"]):
+    headers = {SIGNATURE_HEADER: sign_delta(key, body)} if key else {}
+    return client.post("/ingest", data=body, content_type="application/octet-stream", headers=headers)
+
+
+def test_signed_push_is_indexed_once(client, tmp_path):
+    rows = ledger_rows(str(tmp_path / "site.db"), 10)
+    body = encode_delta("booth_ledger_1.db", 0, rows)
+    reply = push(client, body)
+    assert reply.status_code == 200
+    assert reply.get_json()["accepted"] == 10
+
+    reply = push(client, body)
+    assert reply.status_code == 200
+    assert reply.get_json()["accepted"] == 0
+    assert central_verification.booth_watermark("booth_ledger_1.db") == 10
+
+
+@pytest.mark.parametrize("booth_db, key", [
+    ("booth_ledger_1.db", None),
+    ("booth_ledger_1.db", KEYS["booth_ledger_2.db"]),
+    ("booth_ledger_9.db", KEYS["booth_ledger_1.db"]),
+    ("../booth_keys/booth_ledger_1.db", KEYS["booth_ledger_1.db"]),
+])
+def test_push_without_the_booths_key_is_refused(client, tmp_path, booth_db, key):
+    rows = ledger_rows(str(tmp_path / "site.db"), 5)
+    reply = push(client, encode_delta(booth_db, 0, rows), key=key)
+    assert reply.status_code == 401
+    assert central_verification.booth_watermark(booth_db) == 0
+
+
+def test_tampered_body_is_refused(client, tmp_path):
+    rows = ledger_rows(str(tmp_path / "site.db"), 5)
+    body = encode_delta("booth_ledger_1.db", 0, rows)
+    signature = sign_delta(KEYS["booth_ledger_1.db"], body)
+    reply = client.post("/ingest", data=body[:-1] + bytes([body[-1] ^ 1]),
+                        content_type="application/octet-stream", headers={SIGNATURE_HEADER: signature})
+    assert reply.status_code == 401
+
+
+def test_different_row_under_an_indexed_id_is_a_conflict(client, tmp_path):
+    rows = ledger_rows(str(tmp_path / "site_a.db"), 10)
+    assert push(client, encode_delta("booth_ledger_1.db", 0, rows)).status_code == 200
+
+    forged = list(rows)
+    forged[4] = (5, 5, "f" * 64) + rows[4][3:]
+    reply = push(client, encode_delta("booth_ledger_1.db", 0, forged))
+    assert reply.status_code == 409
+    assert reply.get_json()["status"] == "conflict"
+    assert reply.get_json()["conflicting_ids"] == [5]
+
+
+def test_rows_jumped_over_by_a_forged_id_are_a_conflict(client, tmp_path):
+    rows = ledger_rows(str(tmp_path / "site.db"), 12)
+    assert push(client, encode_delta("booth_ledger_1.db", 0, rows[:10])).status_code == 200
+    jump = [(1000,) + rows[10][1:]]
+    assert push(client, encode_delta("booth_ledger_1.db", 10, jump)).status_code == 200
+
+    # The real rows 11 and 12 are now below the watermark but were never indexed.
+    reply = push(client, encode_delta("booth_ledger_1.db", 10, rows[10:]))
+    assert reply.status_code == 409
+    assert reply.get_json()["conflicting_ids"] == [11, 12]
+
+
+def test_two_sites_pushing_as_one_booth_conflict(client, tmp_path):
+    site_a = ledger_rows(str(tmp_path / "site_a.db"), 10)
+    site_b = ledger_rows(str(tmp_path / "site_b.db"), 15, first_voter=100)
+    assert push(client, encode_delta("booth_ledger_1.db", 0, site_a)).status_code == 200
+
+    # Site B starts from the watermark it was given: its row 11 does not
+    # follow site A's block 10.
+    reply = push(client, encode_delta("booth_ledger_1.db", 10, site_b[10:]))
+    assert reply.status_code == 409
+    assert reply.get_json()["conflicting_ids"] == [11]
+    assert central_verification.booth_watermark("booth_ledger_1.db") == 10
+
+
+def test_zlib_bomb_push_is_a_bad_request(client):
+    bomb = zlib.compress(bytes(64 * 1024 * 1024), 9)
+    packed = COMPRESSED_LENGTH.pack(len(bomb)) + bomb
+    body = delta_header("booth_ledger_1.db", 0) + CHUNK_HEADER.pack(
+        1, 1, 1, len(packed), zlib.crc32(packed)
+    ) + packed
+    response = push(client, body)
+    assert response.status_code == 400
+    assert "inflate past" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("body", [
+    b"x",
+    b"OBVVDLT",
+    delta_header("booth_ledger_1.db", 0) + b"\x01\x00",
+    delta_header("booth_ledger_1.db", 0) + CHUNK_HEADER.pack(1, 1, 1, 4, zlib.crc32(b"\xff" * 4)) + b"\xff" * 4,
+])
+def test_malformed_push_is_a_bad_request(client, body):
+    assert push(client, body).status_code == 400
+
+
+def run_agent(agent, done):
+    agent.start()
+    deadline = time.monotonic() + 10
+    while not done(agent) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    agent.stop()
+
+
+def test_sync_agent_signs_its_pushes(client, tmp_path):
+    from werkzeug.serving import make_server
+
+    from booth_sync import SyncAgent
+
+    ledger = str(tmp_path / "booth_ledger_1.db")
+    write_votes(ledger, 30)
+    server = make_server("127.0.0.1", 0, central_verification.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        wrong_key = SyncAgent(ledger, url, KEYS["booth_ledger_2.db"], interval=0.05)
+        run_agent(wrong_key, lambda agent: agent.last_error)
+        assert "HTTP 401" in wrong_key.last_error
+        assert central_verification.booth_watermark("booth_ledger_1.db") == 0
+
+        agent = SyncAgent(ledger, url, KEYS["booth_ledger_1.db"], batch_rows=10, interval=0.05)
+        run_agent(agent, lambda agent: agent.acked_id == 30)
+        assert agent.acked_id == 30
+        assert agent.last_error is None
+        assert central_verification.booth_watermark("booth_ledger_1.db") == 30
+    finally:
+        server.shutdown()
@@ -0,0 +1,73 @@
+import io
+import sqlite3
+import struct
+import zlib
+
+import pytest
+
+from conftest import write_votes
+from ledger_delta import (
+    CHUNK_HEADER, COMPRESSED_LENGTH, DELTA_QUERY, delta_header, encode_delta,
+    iter_delta_chunks, read_delta_header
+)
+
+
+def decode(body):
+    delta = io.BytesIO(body)
+    header = read_delta_header(delta)
+    return header, [row for _, _, rows in iter_delta_chunks(delta) for row in rows]
+
+
+def crafted_chunk(columns, row_count=1, first_id=1, last_id=1, digests=b""):
+    """A chunk whose checksum is right whatever its compressed columns hold."""
+    packed = COMPRESSED_LENGTH.pack(len(columns)) + columns + digests
+    return CHUNK_HEADER.pack(row_count, first_id, last_id, len(packed), zlib.crc32(packed)) + packed
+
+
+def test_round_trip_keeps_every_row(ledger):
+    write_votes(ledger, 120)
+    conn = sqlite3.connect(ledger)
+    conn.execute("""
+        INSERT INTO booth_ledger (vote_count, voter_hash, timestamp, previous_hash, block_hash)
+        VALUES (7, 'not-a-hash', '2026-02-05 21:41:56+05:30', NULL, NULL)
+    """)
+    conn.commit()
+    rows = conn.execute(DELTA_QUERY, (0,)).fetchall()
+    conn.close()
+
+    header, decoded = decode(encode_delta("booth_ledger_1.db", 0, rows, chunk_rows=50))
+    assert header == ("booth_ledger_1.db", 0)
+    assert decoded == rows
+
+
+def test_zlib_bomb_is_refused_before_inflating():
+    bomb = zlib.compress(bytes(64 * 1024 * 1024), 9)
+    body = delta_header("booth_ledger_1.db", 0) + crafted_chunk(bomb)
+    with pytest.raises(ValueError, match="inflate past"):
+        decode(body)
+
+
+@pytest.mark.parametrize("columns", [
+    b"not zlib at all",
+    zlib.compress(bytes(10)),
+    zlib.compress(bytes(25) + b'{"a": 1}'),
+    zlib.compress(b"\x00" + struct.pack("<qqq", 1, 1, 0) + b"[]") + b"tail",
+])
+def test_malformed_chunks_raise_value_error(columns):
+    with pytest.raises(ValueError):
+        decode(delta_header("booth_ledger_1.db", 0) + crafted_chunk(columns))
+
+
+def test_chunk_must_use_every_digest():
+    # One row with a hex voter hash needs 32 digest bytes, not 31 or 33.
+    columns = zlib.compress(b"\x00" + struct.pack("<qqq", 1, 1, 0) + b"[]")
+    for digests in (bytes(31), bytes(33)):
+        with pytest.raises(ValueError):
+            decode(delta_header("booth_ledger_1.db", 0) + crafted_chunk(columns, digests=digests))
+    assert decode(delta_header("booth_ledger_1.db", 0) + crafted_chunk(columns, digests=bytes(32)))
+
+
+def test_row_count_must_fit_the_chunk_ids():
+    columns = zlib.compress(b"\x00" + struct.pack("<qqq", 1, 1, 0) + b"[]")
+    with pytest.raises(ValueError, match="row count"):
+        decode(delta_header("booth_ledger_1.db", 0) + crafted_chunk(columns, row_count=2 ** 31))
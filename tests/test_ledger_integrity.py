@@ -0,0 +1,79 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from conftest import write_votes
+from ledger_merkle import update_merkle
+
+central_verification = pytest.importorskip("central_verification")
+
+
+@pytest.fixture
+def copies(tmp_path, monkeypatch):
+    """An original ledger of 300 votes and the central copy of it."""
+    original_dir = tmp_path / "original"
+    copy_dir = tmp_path / "copy"
+    original_dir.mkdir()
+    copy_dir.mkdir()
+    original = str(original_dir / "booth_ledger_1.db")
+    write_votes(original, 300)
+    shutil.copy(original, copy_dir / "booth_ledger_1.db")
+    monkeypatch.setattr(central_verification, "BASE_DIR", str(copy_dir))
+    monkeypatch.setattr(central_verification, "tree_audits", {})
+    return str(original_dir), str(copy_dir / "booth_ledger_1.db")
+
+
+def alter_row(path, ledger_id):
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE booth_ledger SET timestamp = 'altered' WHERE id = ?", (ledger_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_untouched_copy_passes_audit_and_check(copies):
+    original_dir, _ = copies
+    (audit,) = central_verification.audit_ledger_copies().values()
+    assert audit == {"merkle": True, "stored_tree_matches": True}
+
+    (result,) = central_verification.check_ledger_integrity(original_dir).values()
+    assert result["identical"]
+    assert result["stored_tree_matches"] is True
+    assert result["comparisons"] == 1
+
+
+def test_rows_edited_behind_the_tree_fail_the_audit(copies):
+    original_dir, copy = copies
+    alter_row(copy, 42)
+
+    # The stored trees still agree, so the O(log n) walk cannot see it ...
+    (result,) = central_verification.check_ledger_integrity(original_dir).values()
+    assert result["identical"]
+    assert result["stored_tree_matches"] is None
+
+    # ... the audit does, and later checks report it until the files change.
+    (audit,) = central_verification.audit_ledger_copies().values()
+    assert audit["stored_tree_matches"] is False
+    (result,) = central_verification.check_ledger_integrity(original_dir).values()
+    assert result["stored_tree_matches"] is False
+
+    alter_row(copy, 43)
+    (result,) = central_verification.check_ledger_integrity(original_dir).values()
+    assert result["stored_tree_matches"] is None
+
+
+def test_rows_and_tree_edited_together_are_found(copies):
+    original_dir, copy = copies
+    alter_row(copy, 42)
+    conn = sqlite3.connect(copy)
+    conn.execute("DELETE FROM merkle_nodes")
+    conn.execute("DELETE FROM merkle_state")
+    update_merkle(conn)
+    conn.commit()
+    conn.close()
+
+    (audit,) = central_verification.audit_ledger_copies().values()
+    assert audit["stored_tree_matches"] is True
+    (result,) = central_verification.check_ledger_integrity(original_dir).values()
+    assert not result["identical"]
+    assert result["differing_ids"] == [42]
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from conftest import write_votes
+from ledger_stream import iter_ledger_chunks
+
+
+def test_closing_early_stops_every_reader(tmp_path):
+    sources = []
+    for booth in range(3):
+        path = str(tmp_path / f"booth_ledger_{booth}.db")
+        write_votes(path, 500)
+        sources.append((path, 0))
+    before = threading.active_count()
+
+    for _ in range(3):
+        chunks = iter_ledger_chunks(sources, workers=3, chunk_size=10, depth=1)
+        next(chunks)
+        start = time.perf_counter()
+        chunks.close()
+        assert time.perf_counter() - start < 1
+
+    assert threading.active_count() == before
+
+
+def test_all_rows_arrive_in_booth_order(tmp_path):
+    sources = []
+    for booth in range(3):
+        path = str(tmp_path / f"booth_ledger_{booth}.db")
+        write_votes(path, 100 + booth)
+        sources.append((path, 0))
+
+    timings = {}
+    seen = {}
+    for position, rows in iter_ledger_chunks(sources, timings=timings, workers=2, chunk_size=7):
+        assert position >= max(seen, default=0)
+        seen[position] = seen.get(position, 0) + len(rows)
+    assert seen == {0: 100, 1: 101, 2: 102}
+    assert {position: t["rows"] for position, t in timings.items()} == seen
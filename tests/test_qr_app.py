@@ -0,0 +1,52 @@
+import importlib
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+QR_APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OBVV_QRCODE")
+
+
+@pytest.fixture
+def qr_app(tmp_path, monkeypatch):
+    """OBVV_QRCODE/app.py on a copy of its voters.db, which predates
+    on-demand QR rendering (qr_filename NOT NULL, no qr_token)."""
+    pytest.importorskip("reportlab")
+    shutil.copy(os.path.join(QR_APP_DIR, "booth_secret.key"), tmp_path)
+    shutil.copy(os.path.join(QR_APP_DIR, "voters.db"), tmp_path)
+    (tmp_path / "static" / "qrs").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(QR_APP_DIR)
+    app = importlib.import_module("app")
+    app.migrate_db()
+    return app
+
+
+def test_migration_keeps_voters_and_allows_no_file(qr_app):
+    db = sqlite3.connect(qr_app.DB_NAME)
+    columns = {row[1]: row[3] for row in db.execute("PRAGMA table_info(voters)")}
+    voters = db.execute("SELECT voter_id, qr_filename FROM voters").fetchall()
+    db.close()
+    assert columns["qr_filename"] == 0
+    assert "qr_token" in columns
+    assert len(voters) == 8
+    assert ("JIG3452875", "JIG3452875.png") in voters
+
+
+def test_new_voters_have_no_file_and_delete_cleanly(qr_app, tmp_path):
+    client = qr_app.app.test_client()
+    client.post("/add", data={"voter_id": "NEW0000001", "name": "New Voter"})
+    db = sqlite3.connect(qr_app.DB_NAME)
+    assert db.execute(
+        "SELECT qr_filename FROM voters WHERE voter_id = 'NEW0000001'"
+    ).fetchone() == (None,)
+
+    old_file = tmp_path / "static" / "qrs" / "JIG3452875.png"
+    old_file.write_bytes(b"png")
+    client.post("/delete/NEW0000001")
+    client.post("/delete/JIG3452875")
+    remaining = {voter_id for voter_id, in db.execute("SELECT voter_id FROM voters")}
+    db.close()
+    assert not remaining & {"NEW0000001", "JIG3452875"}
+    assert not old_file.exists()
@@ -0,0 +1,110 @@
+import sqlite3
+
+from blockchain import Block, Blockchain, genesis_block, verify_chain
+from conftest import voter_hash, write_votes
+from ledger_writer import LedgerWriter
+
+
+def test_genesis_block_is_deterministic():
+    assert Blockchain().get_latest_block().hash == Blockchain().get_latest_block().hash
+    assert Blockchain().get_latest_block().hash == genesis_block().hash
+
+
+def test_intact_ledger_is_valid(ledger):
+    write_votes(ledger, 50)
+    result = verify_chain(ledger)
+    assert result["valid"]
+    assert result["blocks"] == 50
+    assert result["index_breaks"] == 0
+
+
+def test_rows_cut_from_the_start_are_caught(ledger):
+    write_votes(ledger, 10)
+    conn = sqlite3.connect(ledger)
+    conn.execute("DELETE FROM booth_ledger WHERE id IN (1, 2, 3)")
+    conn.commit()
+    conn.close()
+
+    result = verify_chain(ledger)
+    assert not result["valid"]
+    assert result["index_breaks"] == 1
+    assert (4, "broken link") in result["problems"]
+
+
+def test_first_block_must_follow_genesis(ledger):
+    stray = Block(index=1, timestamp="2026-02-05T21:41:56.958952",
+                  voter_hash=voter_hash(0), previous_hash="ab" * 32)
+    writer = LedgerWriter(ledger)
+    writer.save_vote(stray.index, stray.voter_hash, stray.timestamp,
+                     previous_hash=stray.previous_hash, block_hash=stray.hash)
+    writer.close()
+    assert verify_chain(ledger)["problems"] == [(1, "broken link")]
+
+
+def test_index_break_makes_ledger_invalid(ledger):
+    chain = write_votes(ledger, 3)
+    # Correctly linked and hashed, but skips block 4.
+    tip = chain.get_latest_block()
+    skipped = Block(index=tip.index + 2, timestamp="2026-02-05T21:41:57.000000",
+                    voter_hash=voter_hash(99), previous_hash=tip.hash)
+    writer = LedgerWriter(ledger)
+    writer.save_vote(skipped.index, skipped.voter_hash, skipped.timestamp,
+                     previous_hash=skipped.previous_hash, block_hash=skipped.hash)
+    writer.close()
+
+    result = verify_chain(ledger)
+    assert not result["valid"]
+    assert result["index_breaks"] == 1
+
+
+def test_checkpoint_of_empty_ledger_advances(ledger):
+    LedgerWriter(ledger).close()
+    empty = verify_chain(ledger)
+    assert empty["valid"]
+
+    write_votes(ledger, 20)
+    result = verify_chain(ledger, since=empty["checkpoint"])
+    assert result["valid"]
+    assert result["blocks"] == 20
+    assert result["checkpoint"][0] == 20
+
+
+def test_incremental_verify_checks_index_after_checkpoint(ledger):
+    chain = write_votes(ledger, 5)
+    first = verify_chain(ledger)
+    write_votes(ledger, 5, chain=chain, first_voter=5)
+    assert verify_chain(ledger, since=first["checkpoint"])["valid"]
+
+    conn = sqlite3.connect(ledger)
+    conn.execute("DELETE FROM booth_ledger WHERE id = 6")
+    conn.commit()
+    conn.close()
+    result = verify_chain(ledger, since=first["checkpoint"])
+    assert not result["valid"]
+    assert result["checkpoint"] == first["checkpoint"]
+
+
+def test_legacy_unlinked_rows_may_restart_their_count(ledger):
+    conn = sqlite3.connect(ledger)
+    conn.execute("""
+        CREATE TABLE booth_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vote_count INTEGER, voter_hash TEXT, timestamp TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO booth_ledger (vote_count, voter_hash, timestamp) VALUES (?, ?, ?)",
+        [(1, voter_hash(0), "2026-02-05T21:41:56.958952"),
+         (1, voter_hash(1), "2026-02-06T00:01:44.922893"),
+         (2, voter_hash(2), "2026-02-06T00:02:44.922893")]
+    )
+    conn.commit()
+    conn.close()
+
+    result = verify_chain(ledger)
+    assert result["valid"]
+    assert result["unlinked"] == 3
+
+    # A booth reopening the ledger links new blocks onto the legacy rows.
+    write_votes(ledger, 3, first_voter=10)
+    assert verify_chain(ledger)["valid"]